@@ -1,22 +1,36 @@
-import requests
 import os
+import re
 import json
 import sys
-import random
 from typing import List, TYPE_CHECKING
 if TYPE_CHECKING:
     from game import Game
     from mr_cards import MrCard
 from card import UnoCard
 from util import PlayAction
+from llm_client import shared_client, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, DEFAULT_MAX_RETRIES
+from decision_cache import shared_cache, opponent_hand_counts, DEFAULT_CAPACITY
 
 HAND_LIMIT = 20
 
+# LLM 回复开头的决策：'draw' 或 'play N'，其后必须是非单词字符或回复结尾
+_ACTION_RE = re.compile(r"\s*['\"`]?(draw|play\s+(\d+))(?=\W|$)")
+
+def parse_action(text: str, final: bool = True):
+    """从LLM回复中解析 (action_type, card_index)，无法解析时返回 None。
+    final 为 False 时表示回复还在流式接收中，只有决策后面已经出现其他字符（确认数字已完整）才返回。"""
+    match = _ACTION_RE.match(text)
+    if match and (final or match.end() < len(text)):
+        if match.group(2) is not None:
+            return 'play', int(match.group(2))
+        return 'draw', None
+    return None
+
 class AI:
-    def __init__(self, ai_level='rule_based'):
+    def __init__(self, ai_level='rule_based', api_url: str = None, api_key: str = None):
         self.ai_level = ai_level
         if self.ai_level == 'llm_based':
-            self.llm_ai = DeepSeekAI()
+            self.llm_ai = DeepSeekAI(api_url, api_key)
 
     def choose_action(self, player, game_state):
         """
@@ -27,7 +41,12 @@ class AI:
         if self.ai_level == 'rule_based':
             return self.rule_based_choice(player, game_state)
         elif self.ai_level == 'llm_based':
-            return self.llm_ai.choose_action(player, game_state)
+            try:
+                return self.llm_ai.choose_action(player, game_state)
+            except Exception as e:
+                # LLM决策出现意外错误时不中断对局，退回规则AI
+                print(f"LLM决策出错，改用规则AI: {e}")
+                return self.rule_based_choice(player, game_state)
         return None, None
 
     def choose_wild_color(self, player):
@@ -40,7 +59,7 @@ class AI:
         
         # Return the color with the highest count
         if not any(color_counts.values()):
-            return random.choice(colors) # No colored cards, pick randomly
+            return player.game.rng.choice(colors) # No colored cards, pick randomly
             
         return max(color_counts, key=color_counts.get)
 
@@ -48,10 +67,11 @@ class AI:
         """
         A more advanced rule-based AI.
         """
-        valid_cards = []
-        for i, card in enumerate(player.uno_list):
-            if player.check_card(card):
-                valid_cards.append((i, card))
+        # 一次按位与得到全部可出的牌
+        playable = player.playable_mask()
+        if not playable:
+            return 'draw', None
+        valid_cards = [(i, card) for i, card in enumerate(player.uno_list) if playable >> card.id & 1]
 
         if not valid_cards:
             return 'draw', None
@@ -158,8 +178,20 @@ class AI:
                     return False
 
 class DeepSeekAI:
-    def __init__(self):
+    def __init__(self, api_url: str = None, api_key: str = None):
         self.load_config()
+        if api_url:
+            self.api_url = api_url
+        if api_key is not None:
+            self.api_key = api_key
+        # 同一接口的所有LLM玩家共用一个客户端（连接池、超时、重试与熔断）
+        self.client = shared_client(self.api_url, self.api_key, **self.client_options)
+        # 相同局面直接复用此前的决策
+        self.cache = shared_cache(self.cache_path, capacity=self.cache_size, ttl=self.cache_ttl)
+        # LLM不可用或返回无法解析时的后备
+        self.fallback = AI(ai_level='rule_based')
+        # 武将名 -> 系统消息；同一武将整局（及之后各局）发送完全相同的系统消息
+        self._system_messages = {}
     
     def load_config(self):
         """
@@ -172,6 +204,20 @@ class DeepSeekAI:
             config = json.load(f)
         self.api_key = config.get('ai_api_key', '')
         self.api_url = config.get('ai_base_url', '')
+        # 可选：ai_connect_timeout / ai_read_timeout（秒）、ai_max_retries
+        self.client_options = {
+            'connect_timeout': config.get('ai_connect_timeout', DEFAULT_CONNECT_TIMEOUT),
+            'read_timeout': config.get('ai_read_timeout', DEFAULT_READ_TIMEOUT),
+            'max_retries': config.get('ai_max_retries', DEFAULT_MAX_RETRIES),
+        }
+        # 可选：ai_cache_size（条）、ai_cache_ttl（秒，默认不过期）、ai_cache_path（落盘文件，默认只在内存中）
+        self.cache_size = config.get('ai_cache_size', DEFAULT_CAPACITY)
+        self.cache_ttl = config.get('ai_cache_ttl')
+        self.cache_path = config.get('ai_cache_path')
+        # 可选：ai_stream，是否使用流式回复并在解析出决策后立即断开（默认开启）
+        self.stream = config.get('ai_stream', True)
+        # 可选：ai_prompt_mode，'compact'（默认，固定的系统消息 + 一行简短局面）或 'verbose'（完整中文说明）
+        self.prompt_mode = config.get('ai_prompt_mode', 'compact')
 
     def choose_action(self, player, game_state):
         """
@@ -180,35 +226,51 @@ class DeepSeekAI:
         game_state: 包含游戏当前状态的字典
         返回：(action_type, card_index)
         """
-        prompt = self.construct_prompt(player, game_state)
-        headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
-        }
-        data = {
-            "model": "deepseek-chat",
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.2
-        }
-        response = requests.post(self.api_url, headers=headers, json=data)
-        if response.status_code == 200:
-            result = response.json()
-            try:
-                answer = result['choices'][0]['message']['content']
-                # 解析AI的返回结果，例如 "play 3" or "draw"
-                parts = answer.strip().split()
-                action_type = parts[0]
-                card_index = int(parts[1]) if len(parts) > 1 else None
-                return action_type, card_index
-            except Exception:
-                # 如果LLM返回错误，使用规则AI作为后备
-                return AI(ai_level='rule_based').rule_based_choice(player, game_state)
+        cached = self.cache.lookup(player, game_state)
+        if cached is not None:
+            return cached
+        if self.prompt_mode == 'verbose':
+            messages = [{"role": "user", "content": self.construct_prompt(player, game_state)}]
+        else:
+            messages = [self.system_message(player), {"role": "user", "content": self.encode_state(player, game_state)}]
+        # 解析AI的返回结果，例如 "play 3" or "draw"
+        if self.stream:
+            action = self.client.chat_stream(messages, parse_action, temperature=0.2)
         else:
-            print("AI请求失败：", response.text)
-            # 如果API请求失败，使用规则AI作为后备
-            return AI(ai_level='rule_based').rule_based_choice(player, game_state)
+            answer = self.client.chat(messages, temperature=0.2)
+            action = parse_action(answer) if answer is not None else None
+        if action is None:
+            # 如果API请求失败、处于熔断期或返回无法解析，使用规则AI作为后备（后备决策不缓存）
+            return self.fallback.rule_based_choice(player, game_state)
+        action_type, card_index = action
+        self.cache.store(player, game_state, action_type, card_index)
+        return action_type, card_index
+
+    def system_message(self, player):
+        """紧凑模式的系统消息：规则、牌码与输入格式说明，只随武将变化，便于接口端复用前缀缓存"""
+        message = self._system_messages.get(player.mr_card.name)
+        if message is None:
+            skills = player.mr_card.skill_description.replace('\n', ' ')
+            content = (
+                "你在玩带三国杀武将技能的UNO，目标是先出完手牌。"
+                "规则：出与顶牌颜色相同或数字/功能相同的牌；W、W+4可随时出并指定颜色；+2、+4让下家摸牌，可以叠加。"
+                "牌码：r红 b蓝 y黄 g绿 接数字0-9，S跳过，R反转，+2；W万能牌，W+4为+4万能牌。"
+                f"你的武将：{player.mr_card.name}，{skills}"
+                "每步输入一行：H 手牌(序号:牌码，序号从0开始) T 顶牌 C 当前颜色 D 需摸张数 F 方向(+1顺时针/-1逆时针)"
+                " O 从下家开始各对手的手牌数。"
+                "只回答 'play 序号' 或 'draw'，不要解释。"
+            )
+            message = self._system_messages[player.mr_card.name] = {"role": "system", "content": content}
+        return message
+
+    def encode_state(self, player, game_state):
+        """紧凑模式的每步局面，例如：H 0:r5 1:bS 2:W T g+2 C g D 2 F +1 O 9,8"""
+        last_card = game_state['last_card']
+        hand = ' '.join(f"{i}:{card.code}" for i, card in enumerate(player.uno_list))
+        color = game_state['current_color']
+        return (f"H {hand} T {last_card.code if last_card else '-'} C {color[0] if color else '-'} "
+                f"D {game_state['draw_n']} F {game_state['game_direction']:+d} "
+                f"O {','.join(map(str, opponent_hand_counts(player, game_state)))}")
 
     def construct_prompt(self, player, game_state):
         """构建发送给LLM的详细prompt"""
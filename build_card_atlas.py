@@ -0,0 +1,90 @@
+"""构建卡牌图集：把 images/uno_images 下的全部卡牌PNG合并成一张 atlas.png，并生成索引 atlas.json。
+
+游戏启动时 gui.py 只需解码这一张图，再按索引切出各张卡牌；图集不存在时自动退回逐个读取PNG。
+索引中记录每张源图片的 [文件大小, mtime_ns, sha1]，源图片改动后对应的帧视为过期，改为读取该PNG。
+生成的图集随仓库提交；修改或新增卡牌图片后重新运行：
+    python build_card_atlas.py
+"""
+import os
+import sys
+import json
+import hashlib
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPainter
+
+SOURCE_DIR = os.path.join('images', 'uno_images')
+ATLAS_IMAGE = 'atlas.png'
+ATLAS_INDEX = 'atlas.json'
+MAX_ROW_WIDTH = 1024
+PADDING = 1  # 相邻图片之间留1像素，避免平滑缩放时串色
+
+
+def collect_images(source_dir):
+    """读取目录下的全部卡牌图片（不含图集自身），返回 {文件名: QImage}"""
+    images = {}
+    for name in sorted(os.listdir(source_dir)):
+        if not name.lower().endswith('.png') or name == ATLAS_IMAGE:
+            continue
+        image = QImage(os.path.join(source_dir, name))
+        if image.isNull():
+            print(f"跳过无法读取的图片: {name}")
+            continue
+        images[name] = image
+    return images
+
+
+def file_signature(path):
+    """源文件的 [文件大小, mtime_ns, sha1]，用于运行时判断图集中的帧是否过期"""
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        sha1 = hashlib.sha1(f.read()).hexdigest()
+    return [stat.st_size, stat.st_mtime_ns, sha1]
+
+
+def pack(sizes, max_row_width=MAX_ROW_WIDTH):
+    """简单的行式装箱：按高度从大到小依次排入，一行放不下就换行。
+    返回 ({文件名: (x, y)}, 图集宽, 图集高)"""
+    positions = {}
+    x = y = row_height = width = 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if x > 0 and x + w > max_row_width:
+            y += row_height + PADDING
+            x = row_height = 0
+        positions[name] = (x, y)
+        x += w + PADDING
+        row_height = max(row_height, h)
+        width = max(width, x - PADDING)
+    return positions, width, y + row_height
+
+
+def build_atlas(source_dir=SOURCE_DIR):
+    images = collect_images(source_dir)
+    if not images:
+        raise SystemExit(f"{source_dir} 中没有找到卡牌图片")
+    sizes = {name: (image.width(), image.height()) for name, image in images.items()}
+    positions, width, height = pack(sizes)
+
+    atlas = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+    atlas.fill(Qt.transparent)
+    painter = QPainter(atlas)
+    for name, image in images.items():
+        x, y = positions[name]
+        painter.drawImage(x, y, image)
+    painter.end()
+
+    atlas_path = os.path.join(source_dir, ATLAS_IMAGE)
+    if not atlas.save(atlas_path):
+        raise SystemExit(f"无法写入 {atlas_path}")
+    index = {
+        'image': ATLAS_IMAGE,
+        'frames': {name: [*positions[name], *sizes[name]] for name in images},
+        'sources': {name: file_signature(os.path.join(source_dir, name)) for name in images},
+    }
+    with open(os.path.join(source_dir, ATLAS_INDEX), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    print(f"已生成 {atlas_path}（{width}x{height}，{len(images)} 张图片）")
+
+
+if __name__ == '__main__':
+    build_atlas(sys.argv[1] if len(sys.argv) > 1 else SOURCE_DIR)
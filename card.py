@@ -1,4 +1,28 @@
-from typing import Callable
+from typing import Callable, Iterable, List
+from array import array
+
+COLORS = ('red', 'blue', 'yellow', 'green')
+
+def _deck_spec():
+    """标准108张牌的 (type, color, value)，顺序即卡牌id"""
+    spec = []
+    for color in COLORS:
+        for number in [0] + 2 * list(range(1, 10)):
+            spec.append(('number', color, number))
+        for action in ['reverse', 'skip', 'draw2'] * 2:
+            spec.append((action, color, 0))
+    for _ in range(4):
+        spec.append(('wild', 'wild', 10))
+        spec.append(('wild_draw4', 'wild_draw4', 10))
+    return spec
+
+_DECK_SPEC = _deck_spec()
+# 牌面id：(type, color, value) 相同的牌共享同一个牌面id，用于跳牌等整数比较
+_FACE_IDS = {}
+for _face in _DECK_SPEC:
+    _FACE_IDS.setdefault(_face, len(_FACE_IDS))
+
+_TYPE_CODES = {'skip': 'S', 'reverse': 'R', 'draw2': '+2'}
 
 class UnoCard:
     """UNO Card class representing a card in the game UNO.
@@ -6,11 +30,18 @@ class UnoCard:
         type (str): The type of the card (e.g., "number", "action", "wild","wild_draw4").  
         color (str): The color of the card (e.g., "red", "blue", "green", "yellow").
         value (int): The value of the card, if applicable (e.g., 0-9 for number cards, skip, reverse etc.).
+        id (int): 牌组中的唯一编号（0-107，武圣虚拟牌为108），临时构造的牌为None
+        face (int): 牌面编号，(type, color, value) 相同则相同
+    整副牌在模块加载时创建一次（见 DECK），游戏中只传递这些共享实例。
     """
-    def __init__(self, type: str, color: str, value: int):
+    __slots__ = ('type', 'color', 'value', 'id', 'face')
+
+    def __init__(self, type: str, color: str, value: int, id: int = None):
         self.type = type
         self.color = color
         self.value = value
+        self.id = id
+        self.face = _FACE_IDS.setdefault((type, color, value), len(_FACE_IDS))
 
     @property
     def content(self):
@@ -29,9 +60,45 @@ class UnoCard:
             return "[+4 万能牌]"
         return f"[{self.color}] {self.type}"
 
+    @property
+    def code(self):
+        """简短牌码，用于LLM提示：颜色首字母 r/b/y/g 加数字或 S(跳过)/R(反转)/+2；万能牌为 W、W+4"""
+        if self.type == 'wild':
+            return 'W'
+        if self.type == 'wild_draw4':
+            return 'W+4'
+        return self.color[0] + _TYPE_CODES.get(self.type, str(self.value))
+
     def __str__(self):
         return f"{self.color} {self.type} {self.value}"
 
+# 整副牌的共享实例，DECK[i].id == i
+DECK = tuple(UnoCard(t, c, v, id=i) for i, (t, c, v) in enumerate(_DECK_SPEC))
+DECK_SIZE = len(DECK)
+# 武圣：红色牌当作[红+2]打出时使用的虚拟牌
+WUSHENG_CARD = UnoCard('draw2', 'red', 0, id=DECK_SIZE)
+# 按id索引的全部卡牌（含武圣虚拟牌）
+CARDS = DECK + (WUSHENG_CARD,)
+
+# 各颜色牌的卡牌id位图（不含武圣虚拟牌）
+COLOR_MASKS = {color: sum(1 << card.id for card in DECK if card.color == color) for color in COLORS}
+
+def deck_card(type: str, color: str, value: int) -> UnoCard:
+    """返回牌面为 (type, color, value) 的第一张牌组实例"""
+    face = _FACE_IDS.get((type, color, value))
+    for card in DECK:
+        if card.face == face:
+            return card
+    raise ValueError(f"牌组中没有这张牌: {color} {type} {value}")
+
+def encode_cards(cards: Iterable[UnoCard]) -> array:
+    """将卡牌序列编码为紧凑的 array('B')（每张牌1字节）"""
+    return array('B', [card.id for card in cards])
+
+def decode_cards(ids: Iterable[int]) -> List[UnoCard]:
+    """将卡牌id序列解码为共享的 UnoCard 实例列表"""
+    return [CARDS[i] for i in ids]
+
 class MRCard:
     def __init__(self, name: str, gender: str, team: str, skills: list, image_path: str = None, skill_description: str = "", tags: str = "", difficulty: int = 5):
         self.name = name          # 武将名
@@ -0,0 +1,167 @@
+"""LLM 电脑玩家的决策缓存。
+
+同一局面（武将、手牌牌面的多重集、场上最后一张牌、当前颜色、待摸张数、方向、各对手手牌数）
+反复出现时直接复用上次的决策，不再构建 prompt 和等待网络往返。缓存按 LRU 淘汰、可设过期时间，
+指定 path 时以 JSON 形式落盘，下次启动继续使用。
+
+缓存的是“打出哪种牌面”而不是手牌索引，命中时再映射回当前手牌中的位置，与手牌顺序无关。
+"""
+import os
+import json
+import time
+import atexit
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+DEFAULT_CAPACITY = 4096
+SAVE_EVERY = 32  # 每新增多少条决策落盘一次（退出时也会保存）
+
+
+def opponent_hand_counts(player, game_state) -> list:
+    """各对手的手牌数，从下家开始按座位顺序排列，与玩家的绝对座位无关"""
+    by_position = {p.position: p for p in game_state['players']}
+    count = len(by_position)
+    return [len(by_position[(player.position + k) % count].uno_list)
+            for k in range(1, count) if (player.position + k) % count in by_position]
+
+
+def state_key(player, game_state) -> str:
+    """局面的规范化键"""
+    opponent_counts = opponent_hand_counts(player, game_state)
+    last_card = game_state['last_card']
+    return '|'.join((
+        player.mr_card.name,
+        ','.join(map(str, sorted(card.face for card in player.uno_list))),
+        str(last_card.face) if last_card is not None else '-',
+        str(game_state['current_color']),
+        str(game_state['draw_n']),
+        str(game_state['game_direction']),
+        ','.join(map(str, opponent_counts)),
+    ))
+
+
+def valid_action(action_type, card_index) -> bool:
+    """只有 ('draw', None) 和 ('play', 整数) 是可以缓存的决策"""
+    if action_type == 'draw':
+        return card_index is None
+    return action_type == 'play' and isinstance(card_index, int) and not isinstance(card_index, bool)
+
+
+class DecisionCache:
+    """局面键 -> (action_type, 牌面id或None) 的 LRU/TTL 缓存，线程安全"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, ttl: Optional[float] = None, path: Optional[str] = None):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> [action_type, face, 写入时间]
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+            atexit.register(self.save)
+
+    def lookup(self, player, game_state):
+        """命中时返回可直接执行的 (action_type, card_index)，否则返回 None"""
+        key = state_key(player, game_state)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.time() - entry[2] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        action_type, face = entry[0], entry[1]
+        if face is None:
+            return action_type, None
+        for index, card in enumerate(player.uno_list):
+            if card.face == face:
+                return action_type, index
+        return None
+
+    def store(self, player, game_state, action_type, card_index):
+        """记录一次决策；不是 'draw' / 'play N'、出牌索引越界或该牌不能出（LLM 回答无效）时不缓存"""
+        if not valid_action(action_type, card_index):
+            return
+        face = None
+        if card_index is not None:
+            if not 0 <= card_index < len(player.uno_list):
+                return
+            card = player.uno_list[card_index]
+            if action_type == 'play' and not player.playable_mask() >> card.id & 1:
+                return
+            face = card.face
+        key = state_key(player, game_state)
+        with self._lock:
+            self._entries[key] = [action_type, face, time.time()]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+            self._unsaved += 1
+            save_now = self.path and self._unsaved >= SAVE_EVERY
+        if save_now:
+            self.save()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        with self._lock:
+            for key, entry in entries.items():
+                # 丢弃旧版本写入的无效决策（落盘的是牌面id，与出牌索引同为整数）
+                if not valid_action(entry[0], entry[1]):
+                    continue
+                if self.ttl is None or now - entry[2] <= self.ttl:
+                    self._entries[key] = entry
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            entries = dict(self._entries)
+            self._unsaved = 0
+        directory = os.path.dirname(os.path.abspath(self.path))
+        tmp_path = self.path + '.tmp'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"决策缓存保存失败: {e}")
+
+    def stats(self) -> dict:
+        return {'cache_hits': self.hits, 'cache_misses': self.misses}
+
+    def reset_stats(self):
+        """清零命中计数（缓存内容保留），用于分批统计"""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def shared_cache(path: Optional[str] = None, **options) -> DecisionCache:
+    """同一落盘路径（或纯内存）共用一个缓存，跨对局复用；options 只在首次创建时生效"""
+    with _CACHES_LOCK:
+        cache = _CACHES.get(path)
+        if cache is None:
+            cache = _CACHES[path] = DecisionCache(path=path, **options)
+        return cache
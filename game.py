@@ -1,20 +1,30 @@
 from player import Player, HumanPlayer, AIPlayer
 from typing import List, Callable
-from card import UnoCard
-from util import PlayedCards, PlayAction
+from card import UnoCard, CARDS, DECK_SIZE, deck_card, encode_cards
+from array import array
+from util import PlayedCards, PlayAction, DrawChain
+from history import EventLog, EventKind, GameEvent
 import random
 from ai import AI
-from PyQt5.QtWidgets import QMessageBox
 
 #胜利条件
 class Game:
-    def __init__(self, player_num: int, test_mode=False):
+    def __init__(self, player_num: int, test_mode=False, seed: int = None, recycle_discards: bool = True,
+                 history_path: str = None):
         self.player_num = player_num
         self.test_mode = test_mode
+        # 摸牌堆耗尽时是否将弃牌洗回牌堆（关闭则沿用“牌堆拿完即比较手牌”的结算）
+        self.recycle_discards = recycle_discards
+        # 每局独立的随机数生成器：所有洗牌/随机选择都经由它，保证同一 seed 可完整复现对局
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed)
         self.playedcards = PlayedCards()
 
         self.player_list: List[Player] = []
-        self.unocard_pack: List[UnoCard] = []
+        # 摸牌堆：按卡牌id存储的 array('B')，取牌时经 CARDS 解码
+        self.unocard_pack: array = array('B')
 
         self.cur_location: int = None
         self.dir: int = 1  # 回合方向 1/-1
@@ -26,7 +36,7 @@ class Game:
         self.ai_handler = AI()
 
         # 当前的+牌串
-        self.draw_chain_cards: List[UnoCard] = []
+        self.draw_chain_cards = DrawChain()  # +牌串：(effective_card, original_card, source_player)
 
         # 游戏是否结束的标志
         self.game_over = False
@@ -38,9 +48,10 @@ class Game:
         self.player_in_discard = None
         self.cards_to_draw_in_discard = []
         self.num_to_discard = 0
-        # 历史记录（仅在Game维护，GUI被动刷新）
-        self.history_lines = []  # list[str]
-        self.max_history = 50
+        # 历史记录（仅在Game维护，GUI被动刷新）：结构化事件，显示时才渲染成文字
+        # 容量足以保存整局；历史面板按需分页渲染，不受条数影响
+        self.max_history = 10000
+        self.history = EventLog(self.max_history, spill_path=history_path)
         # 跳牌后抑制下一条普通出牌历史标志（用于避免“跳牌！”后立刻出现常规出牌格式）
         self.suppress_next_play_history = False
 
@@ -54,6 +65,12 @@ class Game:
         # 统计数据：每位玩家的结算回顾
         # 结构: { player: { 'played_cards': int, 'drawn_cards': int, 'skills_used': int, 'caused_neighbor_draws': int } }
         self.stats = {}
+        # 获胜玩家列表（平局时为多名），在 check_win_condition 中写入
+        self.winners = []
+        # 跳牌索引：牌面id -> 手中持有该牌面的玩家集合（由 util.Hand 增量维护）
+        self.jump_index = {}
+        # 无GUI模式下由 run_to_completion 同步执行的下一步（代替 QTimer 调度）
+        self._pending_step = None
 
     def _ensure_player_stats(self, player):
         if player not in self.stats:
@@ -82,67 +99,48 @@ class Game:
         """将强制摸牌数按+2/+4贡献者分摊到对应的来源玩家。"""
         if total_draw_count <= 0:
             return
-        # 汇总每个来源玩家的贡献值
-        contributions = []  # list[(source_player, contributed)]
-        for effective_card, original_card, source_player in self.draw_chain_cards:
-            if not source_player:
-                continue
-            contributed = 2 if effective_card.type == 'draw2' else 4 if effective_card.type == 'wild_draw4' else 0
-            if contributed > 0:
-                contributions.append((source_player, contributed))
-        if not contributions:
-            return
-        remaining = int(total_draw_count)
-        for source_player, contributed in contributions:
-            if remaining <= 0:
-                break
-            alloc = min(contributed, remaining)
+        # 各来源的累计贡献由+牌串在追加时增量维护，这里只遍历来源玩家
+        for source_player, alloc in self.draw_chain_cards.allocate(int(total_draw_count)):
             self._ensure_player_stats(source_player)
             self.stats[source_player]['caused_neighbor_draws'] += alloc
-            remaining -= alloc
 
     #创造牌组
     def create_unocard_pack(self):
         if self.test_mode:
             # 测试模式：创建固定的牌组，不洗牌
-            self.unocard_pack = []
             # 每个玩家获得相同的8张牌：1张skip, 1张draw2, 1张reverse, 1张wild, 1张wild_draw4, 1张红1, 1张绿1, 1张蓝1
             test_cards = [
-                UnoCard('skip', 'red', 0),
-                UnoCard('draw2', 'blue', 0),
-                UnoCard('reverse', 'green', 0),
-                UnoCard('wild', 'wild', 10),
-                UnoCard('wild_draw4', 'wild_draw4', 10),
-                UnoCard('number', 'red', 1),
-                UnoCard('number', 'green', 1),
-                UnoCard('number', 'blue', 1)
+                deck_card('skip', 'red', 0),
+                deck_card('draw2', 'blue', 0),
+                deck_card('reverse', 'green', 0),
+                deck_card('wild', 'wild', 10),
+                deck_card('wild_draw4', 'wild_draw4', 10),
+                deck_card('number', 'red', 1),
+                deck_card('number', 'green', 1),
+                deck_card('number', 'blue', 1)
             ]
             # 为三个玩家创建相同的牌组，再加上一张额外的牌作为初始牌
-            for _ in range(3):
-                self.unocard_pack.extend(test_cards)
+            self.unocard_pack = encode_cards(test_cards * 3)
             # 添加一张额外的牌作为初始牌（选择一张颜色牌）
-            self.unocard_pack.append(UnoCard('number', 'yellow', 5))
+            self.unocard_pack.append(deck_card('number', 'yellow', 5).id)
             # 不洗牌，保持固定顺序
             print(f"测试模式：创建了 {len(self.unocard_pack)} 张牌，每个玩家8张相同的牌，外加1张初始牌")
         else:
-            # 正常模式
-            colors = ['red','blue','yellow','green']
-            type = ['reverse','skip','draw2']*2
-            numbers = [0] + 2*[i for i in range(1,10)]
-            for color in colors:
-                for number in numbers:
-                    self.unocard_pack.append(UnoCard("number",color,number))
-                for action in type:
-                    self.unocard_pack.append(UnoCard(action,color,0))
-            for _ in range(4):
-                self.unocard_pack.append(UnoCard('wild','wild',10))
-                self.unocard_pack.append(UnoCard('wild_draw4','wild_draw4',10))
-            random.shuffle(self.unocard_pack)
+            # 正常模式：整副牌的卡牌实例在 card.DECK 中预先创建，这里只洗牌id
+            self.unocard_pack = array('B', range(DECK_SIZE))
+            self.rng.shuffle(self.unocard_pack)
+        # 每个牌id在整副牌中的张数（正常模式均为1，测试模式同一张牌会出现多次），重洗弃牌时据此去重
+        self.deck_copies = array('B', bytes(DECK_SIZE))
+        for card_id in self.unocard_pack:
+            self.deck_copies[card_id] += 1
         
     #将玩家加对对局中同时将game赋給玩家
     def add_player(self,player:Player):
         self.player_list.append(player)
         player.game = self
+        # 将已有手牌登记到跳牌索引
+        for face in player.uno_list.faces():
+            self.jump_index.setdefault(face, set()).add(player)
 
     def set_gui(self, gui):
         """设置GUI的引用"""
@@ -156,6 +154,7 @@ class Game:
         from mr_cards import all_heroes
 
         self.player_list.clear()
+        self.jump_index.clear()
         # 不要覆盖player_num，使用构造函数中设置的值
         # self.player_num = len(ai_hero_names) + 1
 
@@ -166,11 +165,11 @@ class Game:
             p1.mr_card = player_mr_card
             self.add_player(p1)
 
-        # 创建AI玩家
-        for i, hero_name in enumerate(ai_hero_names):
+        # 创建AI玩家（player_hero_name 为 None 时即为全AI对局）
+        for hero_name in ai_hero_names:
             other_mr_card = all_heroes.get(hero_name)
             if other_mr_card:
-                p = AIPlayer(position=i + 1, team=other_mr_card.team)
+                p = AIPlayer(position=len(self.player_list), team=other_mr_card.team)
                 p.mr_card = other_mr_card
                 self.add_player(p)
 
@@ -183,39 +182,70 @@ class Game:
 
     def finalize_setup(self):
         """创建牌组、发牌并开始游戏的第一回合。"""
+        print(f"本局随机种子: {self.seed}")
         # 2. 创建和洗牌
         self.create_unocard_pack()
 
         # 3. 随机决定起始玩家 - 确保在玩家列表范围内
         actual_player_count = len(self.player_list)
-        self.cur_location = random.randint(0, actual_player_count - 1)
+        self.cur_location = self.rng.randint(0, actual_player_count - 1)
 
         # 4. 发牌
         self.deal_cards()
         
         # 5. 翻开第一张牌，如果是黑色牌则重新翻牌直到是颜色牌
         while True:
-            card = self.unocard_pack.pop()
+            card = CARDS[self.unocard_pack.pop()]
             if card.type in ['wild', 'wild_draw4']:
                 # 黑色牌置入弃牌堆
                 print(f"游戏开始，第一张牌是黑色牌：{card}，置入弃牌堆")
-                # 不加入playedcards，直接丢弃
+                # 不作为出牌记录，只压入弃牌堆底部
+                self.playedcards.discard(card)
             else:
                 # 颜色牌，加入牌堆并确定颜色
-                self.playedcards.add_card(card, source_player=None)
+                self.playedcards.add_card(card, source_player=None, turn=self.turn_count)
                 self.cur_color = card.color
                 print(f"游戏开始，揭示的第一张牌为：{card}")
                 break
 
+    def recycle_discard_pile(self) -> bool:
+        """摸牌堆耗尽时，将除顶牌外的弃牌洗回摸牌堆。返回是否补充了牌。"""
+        if not self.recycle_discards:
+            return False
+        ids = self.playedcards.take_discards()
+        # 每个id最多洗回“整副牌中的张数 - 仍在手牌中的张数 - 顶牌”张：
+        # 已回到手牌中的牌（如奸雄获得的+2/+4）和顶牌不参与重洗，重复记录的弃牌也只洗回一次
+        available = array('B', self.deck_copies)
+        for player in self.player_list:
+            for card in player.uno_list:
+                if card.id is not None and available[card.id]:
+                    available[card.id] -= 1
+        top = self.playedcards.get_last_play_info()
+        if top and top[1].id is not None and available[top[1].id]:
+            available[top[1].id] -= 1
+        recycled = array('B')
+        for card_id in ids:
+            if available[card_id]:
+                available[card_id] -= 1
+                recycled.append(card_id)
+        if not recycled:
+            return False
+        self.rng.shuffle(recycled)
+        self.unocard_pack.extend(recycled)
+        print(f"摸牌堆耗尽，{len(recycled)} 张弃牌洗回摸牌堆")
+        self.log_event(EventKind.RECYCLE, None, "摸牌堆耗尽，{} 张弃牌洗回摸牌堆", len(recycled))
+        self.notify_draw_pile_changed()
+        return True
+
     def _choose_initial_color(self):
         """选择初始颜色"""
         if self.gui:
             # GUI模式下，弹出颜色选择对话框
             color = self.gui.choose_color_dialog()
-            return color if color else random.choice(['red', 'blue', 'yellow', 'green'])
+            return color if color else self.rng.choice(['red', 'blue', 'yellow', 'green'])
         else:
             # 如果没有GUI，随机选择一个颜色
-            return random.choice(['red', 'blue', 'yellow', 'green'])
+            return self.rng.choice(['red', 'blue', 'yellow', 'green'])
 
     #发牌！每人8张，起始玩家多一张
     def deal_cards(self):
@@ -330,7 +360,7 @@ class Game:
             self.dir *= -1
             # 跳牌时不记录方向反转的历史记录，因为reverse效果不生效
             if not is_jump:
-                self.add_history("方向反转！")
+                self.log_event(EventKind.REVERSE, None, "方向反转！")
         else: # 如果打出的牌不是+2/+4，则清空+牌串
             self.draw_chain_cards.clear()
             self.draw_n = 0
@@ -341,20 +371,29 @@ class Game:
         """处理出牌后可能触发的技能，传递的是原始牌"""
         player.handle_post_play_skills(card)
 
-    def add_history(self, text):
-        """添加历史记录（Game层统一维护）。"""
-        if not text:
-            return
-        self.history_lines.append(text)
-        if len(self.history_lines) > self.max_history:
-            self.history_lines = self.history_lines[-self.max_history:]
-        # 通知GUI刷新（GUI读取 self.history_lines）
+    def log_event(self, kind: EventKind, actor, template: str, *args):
+        """记录一条结构化事件（Game层统一维护）。
+        template 为常量格式串，{actor} 代表行动玩家，其余占位符依次对应 args；文字只在显示时才渲染。"""
+        event = GameEvent(kind, self.turn_count, actor.mr_card.name if actor else None, template, args)
+        self.history.append(event)
+        # 通知GUI刷新（GUI读取 self.history）
         if self.gui and hasattr(self.gui, 'on_history_updated'):
             try:
-                self.gui.on_history_updated(text)
+                self.gui.on_history_updated(event)
             except Exception:
                 pass
 
+    def add_history(self, text):
+        """添加一条已格式化的历史文字（技能返回的提示等）。"""
+        if not text:
+            return
+        self.log_event(EventKind.INFO, None, text)
+
+    @property
+    def history_lines(self) -> list[str]:
+        """渲染后的历史记录文字"""
+        return self.history.render_lines()
+
     # ==================== 跳牌相关的技能触发 ====================
     def _trigger_jump_skills(self, player, jump_card):
         """跳牌后触发的技能（旋风 / 散谣等）。
@@ -386,17 +425,26 @@ class Game:
                 except Exception:
                     pass
 
+    def _finish_game(self, winners):
+        """标记游戏结束并记录胜利事件"""
+        self.game_over = True
+        self.winners = winners
+        if len(winners) == 1:
+            self.log_event(EventKind.WIN, winners[0], "{actor} 获胜！")
+        else:
+            self.log_event(EventKind.WIN, None, "平局：{}", '、'.join(p.mr_card.name for p in winners))
+
     def check_win_condition(self, player):
-        """检查胜利条件：手牌为0或牌堆拿完时先比较手牌数量，再比较点数之和"""
+        """检查胜利条件：手牌为0，或牌堆拿完且无弃牌可重洗时先比较手牌数量，再比较点数之和"""
         # 检查手牌为0的胜利条件
         if len(player.uno_list) == 0:
-            self.game_over = True
+            self._finish_game([player])
             if self.gui:
                 self.gui.show_winner_and_exit(player)
             return True
         
-        # 检查牌堆拿完时的胜利条件
-        if len(self.unocard_pack) == 0:
+        # 检查牌堆拿完（且无法重洗弃牌）时的胜利条件
+        if len(self.unocard_pack) == 0 and not self.recycle_discard_pile():
             # 收集所有玩家的手牌信息
             player_hand_info = {}
             for p in self.player_list:
@@ -411,7 +459,7 @@ class Game:
             if len(players_with_min_count) == 1:
                 # 只有一个玩家手牌数量最少，直接获胜
                 winner = players_with_min_count[0]
-                self.game_over = True
+                self._finish_game([winner])
                 if self.gui:
                     self.gui.show_winner_and_exit(winner)
                 return True
@@ -423,13 +471,13 @@ class Game:
                 if len(winners) == 1:
                     # 只有一个玩家点数之和最小，获胜
                     winner = winners[0]
-                    self.game_over = True
+                    self._finish_game([winner])
                     if self.gui:
                         self.gui.show_winner_and_exit(winner)
                     return True
                 else:
                     # 多个玩家点数之和相同且最小，平局
-                    self.game_over = True
+                    self._finish_game(winners)
                     if self.gui:
                         self.gui.show_draw_and_exit(winners)
                     return True
@@ -472,6 +520,24 @@ class Game:
         first_player = self.get_current_player()
         self._schedule_next_turn(first_player)
 
+    def run_to_completion(self, max_steps: int = 100000):
+        """无GUI模式：同步驱动游戏循环直到结束，返回获胜玩家列表（平局时为多名）。
+
+        取代 GUI 模式下由 QTimer 串起的 execute_gui_game_step / continue_gui_game_loop 链，
+        不引入任何 Qt 依赖。max_steps 用于防止异常对局无限循环。
+        """
+        if self.gui:
+            raise RuntimeError("run_to_completion 只能在无GUI模式下使用")
+        self._schedule_next_turn(self.get_current_player())
+        steps = 0
+        while self._pending_step and not self.game_over and steps < max_steps:
+            step, self._pending_step = self._pending_step, None
+            step()
+            steps += 1
+        self._pending_step = None
+        self.history.close()
+        return self.winners
+
     def execute_gui_game_step(self):
         """执行GUI游戏循环的一个步骤"""
         if self.game_over:
@@ -507,9 +573,12 @@ class Game:
             else:
                 # 没有跳牌，移动到下一个玩家
                 self._advance_to_next_player()
-        else:
+        elif self.gui:
             # 回合未完成，继续等待
             self.gui.restart_game_loop()
+        else:
+            # 无GUI模式下没有外部输入可等待，直接进入下一位
+            self._advance_to_next_player()
 
     def handle_gui_jump_turn(self):
         """处理GUI模式下的跳牌玩家特殊回合（支持出牌者自跳）。"""
@@ -519,14 +588,7 @@ class Game:
         effective_card, original_card, source_player = last_play_info
 
         # 从当前玩家开始，寻找第一个可以跳牌的玩家（包含当前玩家）
-        chosen_pos = None
-        start_pos = self.cur_location
-        for i in range(len(self.player_list)):
-            check_pos = (start_pos + i) % len(self.player_list)
-            player = self.player_list[check_pos]
-            if player.check_for_jump(effective_card):
-                chosen_pos = check_pos
-                break
+        chosen_pos = self._find_jump_position(effective_card)
 
         if chosen_pos is None:
             # 没有任何玩家可以跳牌，则进入下一位
@@ -536,7 +598,7 @@ class Game:
         jump_player = self.player_list[chosen_pos]
         print(f"跳牌玩家特殊回合: {jump_player.mr_card.name}")
         # 记录跳牌历史（不再按普通出牌格式记录）
-        self.add_history(f"{jump_player.mr_card.name} 跳牌！")
+        self.log_event(EventKind.JUMP, jump_player, "{actor} 跳牌！")
         # 抑制下一条普通出牌历史（下一次调用process_play_action的常规记录被跳过）
         self.suppress_next_play_history = True
 
@@ -544,7 +606,11 @@ class Game:
         self.cur_location = chosen_pos
         
         # 安排跳牌玩家的特殊回合
-        if self._is_player_ai(jump_player):
+        if not self.gui:
+            # 无GUI模式：触发跳牌技能后同步执行跳牌回合
+            self._trigger_jump_skills(jump_player, effective_card)
+            self._pending_step = lambda: self.execute_jump_player_turn_gui(jump_player)
+        elif self._is_player_ai(jump_player):
             # AI跳牌玩家，延迟执行并在执行前尝试触发跳牌技能
             self._trigger_jump_skills(jump_player, effective_card)
             self.gui.schedule_jump_player_turn(jump_player, 500)
@@ -591,7 +657,10 @@ class Game:
 
     def _schedule_next_turn(self, next_player, delay_ms=300):
         """安排下一个玩家的回合"""
-        if self._is_player_ai(next_player):
+        if not self.gui:
+            # 无GUI模式：交给 run_to_completion 同步执行
+            self._pending_step = self.execute_gui_game_step
+        elif self._is_player_ai(next_player):
             # AI玩家，延迟执行
             self.gui.schedule_ai_turn(delay_ms)
         else:
@@ -600,7 +669,7 @@ class Game:
 
     def _calculate_draw_chain_total(self):
         """计算+牌串的总摸牌数"""
-        return sum(2 if effective_card.type == 'draw2' else 4 for effective_card, original_card, source_player in self.draw_chain_cards)
+        return self.draw_chain_cards.total
 
     def _clear_draw_chain(self):
         """清空+牌串"""
@@ -634,7 +703,9 @@ class Game:
         print(f"{jump_player.mr_card.name} 可以续上+牌串")
         
         # 安排跳牌玩家的回合
-        if self._is_player_ai(jump_player):
+        if not self.gui:
+            self._pending_step = lambda: self.execute_jump_player_turn_gui(jump_player)
+        elif self._is_player_ai(jump_player):
             # AI跳牌玩家，延迟执行
             self.gui.schedule_jump_player_turn(jump_player, 500)
         else:
@@ -643,16 +714,32 @@ class Game:
 
     def _execute_player_turn(self, player):
         """执行玩家回合"""
-        if self._is_player_ai(player):
-            # AI玩家，直接执行回合
+        if not self.gui:
+            # 无GUI模式：立即执行回合（人类玩家走命令行输入），随后继续循环
             player.turn()
-            # AI出牌/行动后，停顿2秒再继续游戏循环
-            self.gui.schedule_continue_loop(2000)
+            self._pending_step = self.continue_gui_game_loop
+        elif self._is_player_ai(player):
+            # AI玩家：决策前的结算在GUI线程完成，决策本身交给工作线程（LLM请求可能耗时数秒），
+            # 结果回到GUI线程后由 apply_ai_decision 执行，期间界面保持响应
+            if player.begin_turn():
+                self.gui.request_ai_decision(player, *player.decision_snapshot())
+            else:
+                # 被跳过或强制摸牌，回合已结束
+                self.gui.schedule_continue_loop(2000)
         else:
             # 人类玩家，停止游戏循环计时器，显示界面等待用户操作
             self.gui.stop_game_loop()
             self.gui.show_game_round()
 
+    def apply_ai_decision(self, player, action_type, action_value):
+        """在GUI线程执行工作线程给出的AI决策并结束该AI的回合"""
+        if self.game_over or self.get_current_player() is not player:
+            return
+        print(f"AI ({player.mr_card.name}) 决定: {action_type} {action_value if action_value is not None else ''}")
+        player.finish_turn(action_type, action_value)
+        # AI出牌/行动后，停顿2秒再继续游戏循环
+        self.gui.schedule_continue_loop(2000)
+
     def _advance_to_next_player(self):
         """移动到下一个玩家"""
         self.cur_location = self._get_next_player_pos()
@@ -670,7 +757,7 @@ class Game:
         # 检查skip状态
         if self.skip:
             print(f"玩家 {next_player.position+1} ({next_player.mr_card.name}) 被跳过")
-            self.add_history(f"{next_player.mr_card.name} 被跳过！")
+            self.log_event(EventKind.SKIP, next_player, "{actor} 被跳过！")
             if self.gui:
                 self.gui.show_temporary_message(f"玩家 {next_player.position + 1} ({next_player.mr_card.name}) 被跳过！")
             
@@ -752,20 +839,24 @@ class Game:
             return False
         
         # 从当前玩家的位置开始检查跳牌（允许出牌者自己跳）
-        current_pos = self.cur_location
-        for i in range(len(self.player_list)):
-            # 从当前玩家开始，按顺序检查每个玩家
-            check_pos = (current_pos + i) % len(self.player_list)
-            # 如果上一动作是强制摸牌，则禁止“刚被强制摸牌的玩家”立刻跳牌
-            if self.skip_jump_after_forced_draw and self.player_who_just_forced_draw is not None:
-                if self.player_list[check_pos] is self.player_who_just_forced_draw:
-                    continue
-            player = self.player_list[check_pos]
-            potential_jumps = player.check_for_jump(effective_card)
-            if potential_jumps:
-                return True
-        
-        return False
+        # 如果上一动作是强制摸牌，则禁止“刚被强制摸牌的玩家”立刻跳牌
+        excluded = None
+        if self.skip_jump_after_forced_draw:
+            excluded = self.player_who_just_forced_draw
+        return self._find_jump_position(effective_card, excluded) is not None
+
+    def _find_jump_position(self, card: UnoCard, excluded: Player = None):
+        """通过跳牌索引查找从当前玩家起（按座位顺序）第一个可以跳牌的玩家位置，没有则返回None"""
+        candidates = set()
+        if card.type not in ['wild', 'wild_draw4']:
+            candidates.update(self.jump_index.get(card.face, ()))
+        if card.type == 'draw2' and card.color == 'red':
+            candidates.update(p for p in self.player_list if p.can_wusheng_jump(card))
+        candidates.discard(excluded)
+        if not candidates:
+            return None
+        count = len(self.player_list)
+        return min((p.position for p in candidates), key=lambda pos: (pos - self.cur_location) % count)
 
     def continue_game_after_jump_turn(self):
         """跳牌回合结束后继续游戏"""
@@ -1,16 +1,23 @@
 import sys
 import random
 import os
-from card import UnoCard
+import re
+import json
+from collections import OrderedDict
+from functools import lru_cache
+from card import WUSHENG_CARD
 from PyQt5.QtWidgets import (QApplication, QWidget, QPushButton, QVBoxLayout, QMessageBox, 
                              QDialog, QHBoxLayout, QLabel, QComboBox, QListWidget, 
                              QListWidgetItem, QInputDialog, QDialogButtonBox, QGridLayout,
                               QScrollArea, QTextEdit, QStackedLayout, QLayout, QTableWidget,
-                              QTableWidgetItem,
+                              QTableWidgetItem, QListView,
                              QSpacerItem, QSizePolicy, QGraphicsDropShadowEffect)
-from PyQt5.QtCore import Qt, QSize, QTimer
-from PyQt5.QtGui import QIcon, QPixmap, QPalette, QBrush, QImage, QColor, QGuiApplication
+from PyQt5.QtCore import (Qt, QSize, QTimer, QRect, QObject, QRunnable, QThreadPool, pyqtSignal,
+                          QAbstractListModel, QModelIndex, QEvent)
+from PyQt5.QtGui import QIcon, QPixmap, QPalette, QBrush, QImage, QColor, QGuiApplication, QPainter, QPen
 from player import AIPlayer, HumanPlayer
+from thumbnails import ThumbnailCache
+from history import EventLog
 
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -25,14 +32,16 @@ def resource_path(relative_path):
 def get_card_image_path(card):
     """全局函数，用于获取卡牌图片路径"""
     if card is None:
-        return resource_path(os.path.join('images', 'uno_images', 'back.png'))
-        
-    color = card.color
-    type_ = card.type
-    value = card.value
-    
-    base = os.path.join('images', 'uno_images')
+        return _card_image_path('back.png')
+    return _card_image_path(card_image_name(card.type, card.color, card.value))
 
+@lru_cache(maxsize=None)
+def _card_image_path(filename):
+    return resource_path(os.path.join('images', 'uno_images', filename))
+
+@lru_cache(maxsize=None)
+def card_image_name(type_, color, value):
+    """卡牌牌面对应的图片文件名（同一牌面只计算一次）"""
     if type_ == 'number':
         filename = f'{color}_{value}.png'
     elif type_ == 'draw2':
@@ -47,8 +56,308 @@ def get_card_image_path(card):
         filename = 'black_+4.png'
     else:
         filename = 'back.png'
-        
-    return resource_path(os.path.join(base, filename))
+    return filename
+
+class CardAtlas:
+    """卡牌图集（由 build_card_atlas.py 生成）：只解码一张 atlas.png，按索引切出各张卡牌图片。
+
+    图集不存在或读取失败时 available 为 False，调用方退回逐个读取PNG。
+    源图片在生成图集之后被改动（大小或内容与索引中的记录不符）时，丢弃对应的帧，该图片改为逐个读取。
+    """
+    INDEX_FILE = 'atlas.json'
+
+    def __init__(self):
+        self.frames = {}  # 文件名 -> (x, y, w, h)
+        self.pixmap = QPixmap()
+        try:
+            with open(_card_image_path(self.INDEX_FILE), encoding='utf-8') as f:
+                index = json.load(f)
+            pixmap = QPixmap(_card_image_path(index['image']))
+            if not pixmap.isNull():
+                sources = index.get('sources', {})
+                self.pixmap = pixmap
+                self.frames = {name: tuple(rect) for name, rect in index['frames'].items()
+                               if self._is_current(name, sources.get(name))}
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    @staticmethod
+    def _is_current(filename, signature) -> bool:
+        """帧是否与源图片一致。大小和修改时间都相同时不读文件；
+        修改时间不同（例如重新检出仓库）时比较内容哈希。源图片不存在时图集是唯一来源，照常使用"""
+        path = _card_image_path(filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return True
+        if not signature:
+            return False
+        size, mtime_ns, sha1 = signature
+        if stat.st_size != size:
+            return False
+        if stat.st_mtime_ns == mtime_ns:
+            return True
+        import hashlib
+        try:
+            with open(path, 'rb') as f:
+                return hashlib.sha1(f.read()).hexdigest() == sha1
+        except OSError:
+            return False
+
+    @property
+    def available(self) -> bool:
+        return bool(self.frames)
+
+    def get(self, filename: str) -> QPixmap:
+        """切出一张卡牌图片；图集中没有该文件时返回空 QPixmap"""
+        rect = self.frames.get(filename)
+        if rect is None:
+            return QPixmap()
+        return self.pixmap.copy(QRect(*rect))
+
+class CardPixmapCache:
+    """进程级卡牌图片缓存。
+
+    以 (图片文件名, 目标宽, 目标高, 设备像素比) 为键缓存已平滑缩放的 QPixmap，
+    原图同样缓存（尺寸记为0）。按像素内存估算占用，超过 max_bytes 时按 LRU 淘汰。
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()  # key -> (QPixmap, 字节数)
+        self._bytes = 0
+        self._atlas = None  # 首次取图时加载（需要在 QApplication 创建之后）
+
+    def _get(self, key):
+        item = self._items.get(key)
+        if item is None:
+            return None
+        self._items.move_to_end(key)
+        return item[0]
+
+    def _put(self, key, pixmap):
+        nbytes = pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+        self._items[key] = (pixmap, nbytes)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes and len(self._items) > 1:
+            _, (_, evicted) = self._items.popitem(last=False)
+            self._bytes -= evicted
+
+    def source(self, filename: str) -> QPixmap:
+        """原始尺寸的图片：优先从图集切出，否则从磁盘解码（每个文件只解码一次）"""
+        key = (filename, 0, 0, 1.0)
+        pixmap = self._get(key)
+        if pixmap is None:
+            if self._atlas is None:
+                self._atlas = CardAtlas()
+            pixmap = self._atlas.get(filename) if self._atlas.available else QPixmap()
+            if pixmap.isNull():
+                pixmap = QPixmap(_card_image_path(filename))
+            if pixmap.isNull():
+                return pixmap
+            self._put(key, pixmap)
+        return pixmap
+
+    def get(self, card, width: int, height: int, dpr: float = None) -> QPixmap:
+        """返回按 (width, height) 等比缩放的卡牌图片；card 为 None 时返回牌背"""
+        filename = 'back.png' if card is None else card_image_name(card.type, card.color, card.value)
+        if dpr is None:
+            dpr = _device_pixel_ratio()
+        key = (filename, width, height, dpr)
+        pixmap = self._get(key)
+        if pixmap is None:
+            source = self.source(filename)
+            if source.isNull():
+                return source
+            pixmap = source.scaled(round(width * dpr), round(height * dpr), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            pixmap.setDevicePixelRatio(dpr)
+            self._put(key, pixmap)
+        return pixmap
+
+    def clear(self):
+        self._items.clear()
+        self._bytes = 0
+        self._atlas = None
+
+def _device_pixel_ratio() -> float:
+    screen = QGuiApplication.primaryScreen()
+    return screen.devicePixelRatio() if screen else 1.0
+
+CARD_PIXMAPS = CardPixmapCache()
+
+def card_pixmap(card, width: int, height: int) -> QPixmap:
+    """全局函数，获取缩放后的卡牌图片（经 CARD_PIXMAPS 缓存）"""
+    return CARD_PIXMAPS.get(card, width, height)
+
+def get_hero_image_path(hero_card):
+    """武将立绘路径：优先 images/ 下的图片，其次 images_pack/TRINO_heros_images；都不存在时返回 None"""
+    if not hero_card or not hero_card.image_path:
+        return None
+    for folder in ('images', os.path.join('images_pack', 'TRINO_heros_images')):
+        full_path = resource_path(os.path.join(folder, hero_card.image_path))
+        if os.path.exists(full_path):
+            return full_path
+    return None
+
+# 武将立绘的磁盘缩略图缓存（按源文件哈希分档保存，运行时不解码原始大图）
+HERO_THUMBNAILS = ThumbnailCache()
+
+class _PortraitTask(QRunnable):
+    """工作线程：读取一张立绘缩略图（QImage 可在非GUI线程使用，QPixmap 不可以）"""
+    def __init__(self, loader, key):
+        super().__init__()
+        self.loader = loader
+        self.key = key
+
+    def run(self):
+        self.loader.loaded.emit(self.key, HERO_THUMBNAILS.image(*self.key))
+
+class PortraitLoader(QObject):
+    """武将立绘的异步加载器。
+
+    bind() 先给 QLabel 显示占位文字，watch() 关联的滚动区域里只有进入可见范围的立绘才会提交到
+    QThreadPool 解码；解码结果转为 QPixmap 后按 (路径, 宽, 高) 缓存，再次打开对话框时直接命中。
+    show() 用于玩家信息栏：已有缩略图时同步显示，缩略图缓存为空时同样交给线程池生成。
+    """
+    loaded = pyqtSignal(object, QImage)
+
+    def __init__(self):
+        super().__init__()
+        self.pool = QThreadPool.globalInstance()
+        self._cache = {}     # (path, w, h) -> QPixmap
+        self._waiting = {}   # (path, w, h) -> [QLabel]
+        self._deferred = []  # [(QLabel, key)] 尚未进入可见范围的立绘
+        self.loaded.connect(self._on_loaded)
+
+    def bind(self, label, path, width, height, lazy=False):
+        """为 label 设置立绘：命中缓存直接显示，否则显示占位并（lazy 时等到可见再）异步加载"""
+        key = (path, width, height)
+        pixmap = self._cache.get(key)
+        if pixmap is not None:
+            label.setPixmap(pixmap)
+            return
+        label.setText("加载中…")
+        label.setMinimumSize(width, height)
+        if lazy:
+            self._deferred.append((label, key))
+            # 对话框关闭、控件销毁后不再保留引用
+            label.destroyed.connect(lambda _=None, label=label: self._forget(label))
+        else:
+            self._request(label, key)
+
+    def show(self, label, path, width, height):
+        """为必须立即显示的 label（玩家信息栏）设置立绘：内存或磁盘上已有缩略图时同步设置，
+        否则先显示占位，由工作线程解码原图、生成缩略图后再填入。GUI线程不解码原图"""
+        key = (path, width, height)
+        # 同一个 label 改变尺寸后只接受最新一次请求的结果
+        label.portrait_key = key
+        pixmap = self._cache.get(key)
+        if pixmap is None:
+            pixmap = QPixmap.fromImage(HERO_THUMBNAILS.image(path, width, height, generate=False))
+            if pixmap.isNull():
+                label.setText("加载中…")
+                self._request(label, key)
+                return
+            self._cache[key] = pixmap
+        label.setPixmap(pixmap)
+
+    def watch(self, scroll_area):
+        """滚动区域滚动、改变大小或首次显示后，加载进入可见范围的立绘"""
+        scroll_area.verticalScrollBar().valueChanged.connect(self.load_visible)
+        scroll_area.horizontalScrollBar().valueChanged.connect(self.load_visible)
+        scroll_area.viewport().installEventFilter(self)
+        QTimer.singleShot(0, self.load_visible)
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.Resize, QEvent.Show):
+            # 等布局按新尺寸更新完后再判断可见范围
+            QTimer.singleShot(0, self.load_visible)
+        return False
+
+    def _forget(self, label):
+        self._deferred = [(l, key) for l, key in self._deferred if l is not label]
+
+    def load_visible(self, *_):
+        remaining = []
+        for label, key in self._deferred:
+            try:
+                if label.isVisible() and not label.visibleRegion().isEmpty():
+                    self._request(label, key)
+                else:
+                    remaining.append((label, key))
+            except RuntimeError:
+                # 对话框已关闭，控件已被删除
+                pass
+        self._deferred = remaining
+
+    def _request(self, label, key):
+        waiting = self._waiting.get(key)
+        if waiting is not None:
+            waiting.append(label)
+            return
+        self._waiting[key] = [label]
+        self.pool.start(_PortraitTask(self, key))
+
+    def _on_loaded(self, key, image):
+        pixmap = QPixmap.fromImage(image)
+        if not pixmap.isNull():
+            self._cache[key] = pixmap
+        for label in self._waiting.pop(key, []):
+            try:
+                if getattr(label, 'portrait_key', key) != key:
+                    continue
+                if pixmap.isNull():
+                    label.setText("图片加载失败")
+                else:
+                    label.setPixmap(pixmap)
+            except RuntimeError:
+                pass
+
+_PORTRAIT_LOADER = None
+
+class _AIDecisionTask(QRunnable):
+    def __init__(self, runner, ai_handler, view, game_state, callback):
+        super().__init__()
+        self.runner = runner
+        self.ai_handler = ai_handler
+        self.view = view
+        self.game_state = game_state
+        self.callback = callback
+
+    def run(self):
+        try:
+            action = self.ai_handler.choose_action(self.view, self.game_state)
+        except Exception as e:
+            print(f"AI决策失败: {e}")
+            action = ('draw', None)
+        self.runner.decided.emit(self.callback, action)
+
+class AIDecisionRunner(QObject):
+    """在工作线程中调用 AI.choose_action。
+
+    决策基于 AIPlayer.decision_snapshot() 拍下的只读快照，不触碰 Game 状态；
+    结果通过信号排队回到GUI线程，再由回调执行。单线程池保证同一时间只有一个决策在进行，
+    也不会占用立绘加载所用的全局线程池。
+    """
+    decided = pyqtSignal(object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.decided.connect(self._on_decided)
+
+    def request(self, ai_handler, view, game_state, callback):
+        self.pool.start(_AIDecisionTask(self, ai_handler, view, game_state, callback))
+
+    def _on_decided(self, callback, action):
+        callback(*action)
+
+def portrait_loader() -> PortraitLoader:
+    """全局立绘加载器（需在 QApplication 创建之后调用）"""
+    global _PORTRAIT_LOADER
+    if _PORTRAIT_LOADER is None:
+        _PORTRAIT_LOADER = PortraitLoader()
+    return _PORTRAIT_LOADER
 
 def get_faction_image_path(team):
     """获取势力图片的路径"""
@@ -61,13 +370,60 @@ def get_faction_image_path(team):
     return None
 
 _PM_CACHE = {}
+_FONT_SIZE_RE = re.compile(r'font-size:\s*\d+px;?')
+_KEYED_CACHE = {}  # 源文件路径 -> 已抠除白底的原尺寸 QPixmap
+
+# 阈值：RGB 三个通道都不低于该值才视为背景（此时通道差最多为 255-245=10，天然满足“接近灰白”的容差）
+_WHITE_THRESHOLD = 245
+
+def _key_out_near_white(data: bytes, threshold: int = _WHITE_THRESHOLD) -> bytes:
+    """对 ARGB32 像素缓冲整体处理：RGB 都 >= threshold 的像素 alpha 置0，返回新缓冲。
+
+    把整块缓冲当作一个大整数做按位运算，全部在C层完成，不逐像素调用 Python。
+    """
+    npix = len(data) // 4
+    if npix == 0:
+        return data
+    # ARGB32 按本机字节序存储 0xAARRGGBB：小端内存顺序为 B,G,R,A，大端为 A,R,G,B
+    color_offset, alpha_offset = (0, 3) if sys.byteorder == 'little' else (1, 0)
+    table = bytes(1 if i >= threshold else 0 for i in range(256))
+    flags = int.from_bytes(data.translate(table), 'little') >> (8 * color_offset)
+    lowest = int.from_bytes(b'\x01\x00\x00\x00' * npix, 'little')
+    # 每个像素最低字节为1表示三个颜色通道都达到阈值
+    background = flags & (flags >> 8) & (flags >> 16) & lowest
+    if not background:
+        return data
+    alpha_mask = (background * 0xFF) << (8 * alpha_offset)
+    pixels = int.from_bytes(data, 'little') & ~alpha_mask
+    return pixels.to_bytes(len(data), 'little')
+
+def _load_keyed_pixmap(full_path: str) -> QPixmap:
+    """读取图片并抠除近白色背景（原尺寸，每个文件只处理一次）"""
+    pix = _KEYED_CACHE.get(full_path)
+    if pix is not None:
+        return pix
+
+    img = QImage(full_path)
+    if img.isNull():
+        return QPixmap()
+    img = img.convertToFormat(QImage.Format_ARGB32)
+
+    nbytes = img.sizeInBytes() if hasattr(img, 'sizeInBytes') else img.byteCount()
+    ptr = img.bits()
+    ptr.setsize(nbytes)
+    buf = memoryview(ptr)
+    buf[:] = _key_out_near_white(buf.tobytes())
+
+    pix = QPixmap.fromImage(img)
+    _KEYED_CACHE[full_path] = pix
+    return pix
 
 def _load_transparent_pixmap(path: str, size: int) -> QPixmap:
     """加载 PNG 并将近白色背景转为透明，返回缩放后的 QPixmap。
 
     - 适用于源 PNG 不是透明底的情况（白底或近白底）。
     - 仅将非常接近白色的像素置为透明，避免把金黄色高光误删。
-    - 添加简单缓存，避免重复处理。
+    - 抠图对整块像素缓冲一次完成；抠图结果与各尺寸的缩放结果分别缓存。
     """
     full_path = resource_path(path)
     cache_key = (full_path, size)
@@ -77,29 +433,10 @@ def _load_transparent_pixmap(path: str, size: int) -> QPixmap:
     if not os.path.exists(full_path):
         return QPixmap()
 
-    img = QImage(full_path)
-    if img.isNull():
-        return QPixmap()
-
-    img = img.convertToFormat(QImage.Format_ARGB32)
-
-    # 阈值与容差：非常接近白色才视为背景
-    threshold = 245
-    diff_tolerance = 12
+    pix = _load_keyed_pixmap(full_path)
+    if pix.isNull():
+        return pix
 
-    width = img.width()
-    height = img.height()
-
-    for y in range(height):
-        for x in range(width):
-            c = img.pixelColor(x, y)
-            r, g, b, a = c.red(), c.green(), c.blue(), c.alpha()
-            mx, mn = max(r, g, b), min(r, g, b)
-            if r >= threshold and g >= threshold and b >= threshold and (mx - mn) <= diff_tolerance:
-                c.setAlpha(0)
-                img.setPixelColor(x, y, c)
-
-    pix = QPixmap.fromImage(img)
     scaled = pix.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
     _PM_CACHE[cache_key] = scaled
     return scaled
@@ -171,6 +508,31 @@ def create_star_widget(difficulty: int, star_size: int = 28):
 
     return container
 
+# 应用级主题：启动时注册一次，控件状态变化只切换动态属性，不再逐个 setStyleSheet 重新解析样式表
+THEME_STYLESHEET = """
+    PlayerInfoWidget {
+        background-color: rgba(44, 62, 80, 0.7);
+        border: 2px solid #34495e;
+        border-radius: 10px;
+    }
+    PlayerInfoWidget[current="true"] {
+        background-color: rgba(139, 0, 0, 0.8);
+        border: 4px solid #FFD700;
+    }
+    QLabel[role="player-name"] { color: white; font-weight: bold; background: transparent; }
+    QLabel[role="player-hand"] { color: white; background: transparent; }
+    QLabel[role="player-uno"] { color: #FFD700; font-weight: bold; background: transparent; }
+"""
+
+def set_style_state(widget, name, value):
+    """切换控件的动态属性并重新应用主题样式；值未变化时不做任何事"""
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+
 class PlayerInfoWidget(QWidget):
     """用于显示单个玩家信息的组件，模仿三国杀武将栏"""
     def __init__(self, player, is_main_player=False, is_current=False, parent=None):
@@ -185,23 +547,23 @@ class PlayerInfoWidget(QWidget):
             self.layout.setContentsMargins(8, 3, 8, 3)
             self.hero_image_size = (220, 280)  # 进一步大幅放大武将图片
             self.faction_image_size = (60, 60)
-            self.font_size_name = "20px"
-            self.font_size_hand = "20px"
+            self.font_size_name = 20
+            self.font_size_hand = 20
         else: # 其他玩家，更紧凑
             self.layout = QVBoxLayout(self)
             self.layout.setContentsMargins(3, 3, 3, 3)
             self.hero_image_size = (180, 220)  # 进一步大幅放大其他玩家武将图片
             self.faction_image_size = (50, 50)
-            self.font_size_name = "16px"
-            self.font_size_hand = "18px"
+            self.font_size_name = 16
+            self.font_size_hand = 18
             
         self.layout.setSpacing(5)
         
         # 存储基准尺寸用于缩放
         self.base_hero_image_size = self.hero_image_size
         self.base_faction_image_size = self.faction_image_size
-        self.base_font_size_name = int(self.font_size_name.replace('px', ''))
-        self.base_font_size_hand = int(self.font_size_hand.replace('px', ''))
+        self.base_font_size_name = self.font_size_name
+        self.base_font_size_hand = self.font_size_hand
 
         # --- 武将及势力图片区域 ---
         self.hero_image_container = QWidget()
@@ -210,8 +572,7 @@ class PlayerInfoWidget(QWidget):
 
         self.hero_image_label = QLabel()
         if player.mr_card and player.mr_card.image_path:
-            pixmap = QPixmap(resource_path(os.path.join('images', player.mr_card.image_path)))
-            self.hero_image_label.setPixmap(pixmap.scaled(self.hero_image_size[0], self.hero_image_size[1], Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            self._show_hero_image(player.mr_card)
         self.hero_image_label.setAlignment(Qt.AlignCenter)
         hero_image_layout.addWidget(self.hero_image_label, 0, 0, Qt.AlignCenter)
 
@@ -241,9 +602,11 @@ class PlayerInfoWidget(QWidget):
         self.name_label.setAlignment(Qt.AlignCenter)
         self.hand_count_label.setAlignment(Qt.AlignCenter)
         self.uno_state_label.setAlignment(Qt.AlignCenter)
-        self.name_label.setStyleSheet(f"font-size: {self.font_size_name}; color: white; font-weight: bold; background: transparent;")
-        self.hand_count_label.setStyleSheet(f"font-size: {self.font_size_hand}; color: white; background: transparent;")
-        self.uno_state_label.setStyleSheet(f"font-size: {self.font_size_hand}; color: #FFD700; font-weight: bold; background: transparent;")
+        # 颜色等样式由应用级主题按 role 属性统一提供，这里只设置字号
+        self.name_label.setProperty('role', 'player-name')
+        self.hand_count_label.setProperty('role', 'player-hand')
+        self.uno_state_label.setProperty('role', 'player-uno')
+        self._apply_fonts()
         
         self.layout.addWidget(self.hero_image_container)
 
@@ -267,6 +630,14 @@ class PlayerInfoWidget(QWidget):
         self.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
         self.update_style()
 
+    def _show_hero_image(self, hero_card):
+        """按当前尺寸显示武将立绘（来自缩略图缓存，缓存为空时异步生成）"""
+        path = get_hero_image_path(hero_card)
+        if not path:
+            self.hero_image_label.clear()
+            return
+        portrait_loader().show(self.hero_image_label, path, self.hero_image_size[0], self.hero_image_size[1])
+
     def update_info(self, player, is_current):
         """更新信息"""
         self.player = player
@@ -283,27 +654,23 @@ class PlayerInfoWidget(QWidget):
                     if shicai_skill and len(player.uno_list) == 2:
                         should_show_uno = True
                 
-                if should_show_uno:
-                    self.uno_state_label.setText("UNO!")
-                    self.uno_state_label.setStyleSheet(f"font-size: {self.font_size_hand}; color: #FFD700; font-weight: bold; background: transparent;")
-                else:
-                    self.uno_state_label.setText("")
+                self.uno_state_label.setText("UNO!" if should_show_uno else "")
         except RuntimeError:
             pass
         self.update_style()
 
     def update_style(self):
-        """根据是否为当前玩家更新样式"""
-        border_color = "#FFD700" if self.is_current else "#34495e"
-        border_width = 4 if self.is_current else 2 # Current player gets thicker border
-        bg_color = "rgba(139, 0, 0, 0.8)" if self.is_current else "rgba(44, 62, 80, 0.7)"
-        self.setStyleSheet(f"""
-            PlayerInfoWidget {{
-                background-color: {bg_color}; 
-                border: {border_width}px solid {border_color}; 
-                border-radius: 10px;
-            }}
-        """)
+        """根据是否为当前玩家更新样式（只切换 current 属性，样式由主题提供）"""
+        set_style_state(self, 'current', bool(self.is_current))
+
+    def _apply_fonts(self):
+        """按当前缩放设置文字字号"""
+        for label, size in ((self.name_label, self.font_size_name),
+                            (self.hand_count_label, self.font_size_hand),
+                            (self.uno_state_label, self.font_size_hand)):
+            font = label.font()
+            font.setPixelSize(max(1, size))
+            label.setFont(font)
     
     def update_scaling(self, scale_factor):
         """更新缩放"""
@@ -318,15 +685,12 @@ class PlayerInfoWidget(QWidget):
         self.faction_image_size = (scaled_faction_width, scaled_faction_height)
         
         # 更新字体大小
-        scaled_name_font = int(self.base_font_size_name * scale_factor)
-        scaled_hand_font = int(self.base_font_size_hand * scale_factor)
-        self.font_size_name = f"{scaled_name_font}px"
-        self.font_size_hand = f"{scaled_hand_font}px"
+        self.font_size_name = int(self.base_font_size_name * scale_factor)
+        self.font_size_hand = int(self.base_font_size_hand * scale_factor)
         
         # 重新设置武将图片
         if self.player.mr_card and self.player.mr_card.image_path:
-            pixmap = QPixmap(resource_path(os.path.join('images', self.player.mr_card.image_path)))
-            self.hero_image_label.setPixmap(pixmap.scaled(self.hero_image_size[0], self.hero_image_size[1], Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            self._show_hero_image(self.player.mr_card)
         
         # 重新设置势力图片
         faction_path = get_faction_image_path(self.player.team)
@@ -335,15 +699,159 @@ class PlayerInfoWidget(QWidget):
             self.faction_image_label.setPixmap(faction_pixmap.scaled(self.faction_image_size[0], self.faction_image_size[1], Qt.KeepAspectRatio, Qt.SmoothTransformation))
         
         # 更新字体大小
-        self.name_label.setStyleSheet(f"font-size: {self.font_size_name}; color: white; font-weight: bold; background: transparent;")
-        self.hand_count_label.setStyleSheet(f"font-size: {self.font_size_hand}; color: white; background: transparent;")
-        
-        # 更新UNO标签字体大小
-        if hasattr(self, 'uno_state_label') and self.uno_state_label is not None:
-            if self.uno_state_label.text() == "UNO!":
-                self.uno_state_label.setStyleSheet(f"font-size: {self.font_size_hand}; color: #FFD700; font-weight: bold; background: transparent;")
-            else:
-                self.uno_state_label.setStyleSheet(f"font-size: {self.font_size_hand}; color: white; background: transparent;")
+        self._apply_fonts()
+
+class HandWidget(QWidget):
+    """手牌区：用 QPainter 直接绘制全部手牌，自行处理点击、悬停和选中高亮。
+
+    刷新手牌只需替换牌列表并触发一次重绘，不再为每张牌创建 QPushButton。
+    """
+    cardClicked = pyqtSignal(int)
+
+    CARD_WIDTH = 140
+    CARD_HEIGHT = 190
+    OVERLAP = 30  # 相邻两张牌的重叠宽度
+    MIN_STEP = 24  # 手牌过多时相邻两张牌的最小间隔
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cards = []
+        self.selected_idx = None
+        self.hover_idx = None
+        self.clickable = False
+        self.setMouseTracking(True)
+        self.setMinimumHeight(self.CARD_HEIGHT)
+
+    def set_cards(self, cards, clickable=True, selected_idx=None):
+        """设置要显示的牌（已替换为显示用牌面，如武圣下的红+2）"""
+        self.cards = list(cards)
+        self.clickable = clickable
+        self.selected_idx = selected_idx
+        self.hover_idx = None
+        self.updateGeometry()
+        self.update()
+
+    def set_selected(self, idx):
+        if idx != self.selected_idx:
+            self.selected_idx = idx
+            self.update()
+
+    def _layout(self):
+        """返回 (第一张牌的x, 相邻两张牌的间隔, 牌的y)"""
+        n = len(self.cards)
+        step = self.CARD_WIDTH - self.OVERLAP
+        if n > 1:
+            available = self.width() - self.CARD_WIDTH
+            step = max(self.MIN_STEP, min(step, available // (n - 1)))
+        total = self.CARD_WIDTH + step * max(n - 1, 0)
+        return (self.width() - total) // 2, step, (self.height() - self.CARD_HEIGHT) // 2
+
+    def card_rect(self, idx) -> QRect:
+        x0, step, y = self._layout()
+        return QRect(x0 + idx * step, y, self.CARD_WIDTH, self.CARD_HEIGHT)
+
+    def index_at(self, pos):
+        """点击位置对应的手牌序号（后面的牌压在前面的牌上，从上往下找）"""
+        for idx in range(len(self.cards) - 1, -1, -1):
+            if self.card_rect(idx).contains(pos):
+                return idx
+        return None
+
+    def sizeHint(self):
+        n = len(self.cards)
+        width = self.CARD_WIDTH + (self.CARD_WIDTH - self.OVERLAP) * max(n - 1, 0)
+        return QSize(width, self.CARD_HEIGHT)
+
+    def paintEvent(self, event):
+        if not self.cards:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        for idx, card in enumerate(self.cards):
+            rect = self.card_rect(idx)
+            if idx == self.selected_idx:
+                painter.setPen(QPen(QColor('#e67e22'), 2))
+                painter.setBrush(QColor('#f39c12'))
+                painter.drawRoundedRect(rect.adjusted(1, 1, -1, -1), 5, 5)
+            pixmap = card_pixmap(card, self.CARD_WIDTH, self.CARD_HEIGHT)
+            if not pixmap.isNull():
+                dpr = pixmap.devicePixelRatio() or 1.0
+                w, h = round(pixmap.width() / dpr), round(pixmap.height() / dpr)
+                # 与原先按钮图标一致：等比缩放后居中放在牌位中
+                painter.drawPixmap(rect.x() + (rect.width() - w) // 2, rect.y() + (rect.height() - h) // 2, pixmap)
+            if idx == self.hover_idx and self.clickable and idx != self.selected_idx:
+                painter.setPen(QPen(QColor(52, 152, 219), 2))
+                painter.setBrush(Qt.NoBrush)
+                painter.drawRoundedRect(rect.adjusted(1, 1, -1, -1), 5, 5)
+        painter.end()
+
+    def mouseMoveEvent(self, event):
+        idx = self.index_at(event.pos()) if self.clickable else None
+        if idx != self.hover_idx:
+            self.hover_idx = idx
+            self.setCursor(Qt.PointingHandCursor if idx is not None else Qt.ArrowCursor)
+            self.update()
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        if self.hover_idx is not None:
+            self.hover_idx = None
+            self.update()
+        super().leaveEvent(event)
+
+    def mousePressEvent(self, event):
+        if self.clickable and event.button() == Qt.LeftButton:
+            idx = self.index_at(event.pos())
+            if idx is not None:
+                self.cardClicked.emit(idx)
+                return
+        super().mousePressEvent(event)
+
+class CenterStackWidget(QWidget):
+    """中央弃牌堆：常驻控件，直接绘制最近几张牌，只有牌变化时才重绘。"""
+    CARD_WIDTH = 150
+    CARD_HEIGHT = 225
+    Y_OFFSET_STEP = 8   # 大幅减小垂直偏移，形成紧凑堆叠
+    X_OFFSET_STEP = 5   # 增加一个小的水平偏移
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cards = ()
+
+    def set_cards(self, cards):
+        cards = tuple(cards)
+        # 同一张牌是共享对象，按身份比较即可判断是否变化
+        if len(cards) == len(self.cards) and all(a is b for a, b in zip(cards, self.cards)):
+            return
+        self.cards = cards
+        self.update()
+
+    def paintEvent(self, event):
+        if not self.cards:
+            return
+        num_cards = len(self.cards)
+        # 计算整个牌堆的总高度和宽度，使整个牌堆居中
+        total_stack_width = self.CARD_WIDTH + (num_cards - 1) * self.X_OFFSET_STEP
+        total_stack_height = self.CARD_HEIGHT + (num_cards - 1) * self.Y_OFFSET_STEP
+        base_x = (self.width() - total_stack_width) // 2
+        base_y = (self.height() - total_stack_height) // 2
+
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        border_pen = QPen(QColor(255, 255, 255, 128), 1)
+        # 从底层到顶层绘制，后面的牌压在上面
+        for i, card in enumerate(self.cards):
+            x = base_x + i * self.X_OFFSET_STEP
+            y = base_y + i * self.Y_OFFSET_STEP
+            pixmap = card_pixmap(card, self.CARD_WIDTH, self.CARD_HEIGHT)
+            if not pixmap.isNull():
+                painter.drawPixmap(x, y, pixmap)
+            # 边框以区分卡牌
+            painter.setPen(border_pen)
+            painter.setBrush(Qt.NoBrush)
+            painter.drawRoundedRect(QRect(x, y, self.CARD_WIDTH - 1, self.CARD_HEIGHT - 1), 8, 8)
+        painter.end()
 
 class ModeDialog(QDialog):
     def __init__(self, parent=None):
@@ -371,8 +879,9 @@ class SelectHeroDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         from mr_cards import all_heroes
-        import random
         self.main_window = parent
+        # 选将使用主窗口持有的随机数生成器，与对局种子保持一致
+        self.rng = getattr(parent, 'rng', None) or random.Random()
         self.all_heroes = list(all_heroes.keys())
         
         # 检查是否为测试模式，如果是则使用所有武将，否则随机选择三个
@@ -382,7 +891,7 @@ class SelectHeroDialog(QDialog):
             self.setWindowTitle('选择你的武将 (测试模式)')
         else:
             # 随机选择三个武将供玩家选择
-            self.available_heroes = random.sample(self.all_heroes, min(3, len(self.all_heroes)))
+            self.available_heroes = self.rng.sample(self.all_heroes, min(3, len(self.all_heroes)))
             print(f"选择的武将: {self.available_heroes}")  # 调试信息
         self.selected_hero = None
         
@@ -446,7 +955,8 @@ class SelectHeroDialog(QDialog):
         hero_widget.setStyleSheet("background: transparent;")
         
         # 检查是否为测试模式，如果是则使用网格布局，否则使用水平布局
-        if hasattr(self.main_window, 'selected_mode') and self.main_window.selected_mode == '测试模式':
+        is_test_mode = hasattr(self.main_window, 'selected_mode') and self.main_window.selected_mode == '测试模式'
+        if is_test_mode:
             # 测试模式：使用网格布局显示所有武将
             hero_layout = QGridLayout(hero_widget)
             hero_layout.setSpacing(30)  # 增大间距
@@ -456,6 +966,7 @@ class SelectHeroDialog(QDialog):
             scroll_area.setWidgetResizable(True)
             scroll_area.setWidget(hero_widget)
             layout.addWidget(scroll_area)
+            portrait_loader().watch(scroll_area)
         else:
             # 正常模式：使用水平布局
             hero_layout = QHBoxLayout(hero_widget)
@@ -488,21 +999,14 @@ class SelectHeroDialog(QDialog):
             card_layout = QVBoxLayout(card_widget)
             card_layout.setSpacing(1)
             
-            # 武将图片
-            image_path = resource_path(os.path.join('images', hero_card.image_path))
-            print(f"武将 {hero_name} 图片路径: {image_path}")  # 调试信息
+            # 武将图片（后台线程解码，测试模式下只加载滚动到可见范围的立绘）
+            image_path = get_hero_image_path(hero_card)
             image_label = QLabel()
-            if os.path.exists(image_path):
-                pixmap = QPixmap(image_path)
-                if not pixmap.isNull():
-                    target_width = 300  # 缩小图片宽度
-                    target_height = int(target_width * 600 / 530)  # 约340，按比例缩小
-                    pixmap = pixmap.scaled(target_width, target_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    image_label.setPixmap(pixmap)
-                else:
-                    # 如果图片加载失败，显示默认文本
-                    image_label.setText("图片加载失败")
-                    image_label.setStyleSheet("color: #999; font-size: 16px;")
+            if image_path:
+                target_width = 300  # 缩小图片宽度
+                target_height = int(target_width * 600 / 530)  # 约340，按比例缩小
+                image_label.setStyleSheet("color: #999; font-size: 16px;")
+                portrait_loader().bind(image_label, image_path, target_width, target_height, lazy=is_test_mode)
             else:
                 # 如果图片文件不存在，显示默认文本
                 image_label.setText("图片不存在")
@@ -613,16 +1117,9 @@ class SelectHeroDialog(QDialog):
 
     def on_hero_clicked(self, widget, hero_name):
         """处理武将卡片点击事件"""
-        # 清除之前的选择
+        # 切换选中状态（只有状态变化的卡片会重新应用样式）
         for card_widget, _ in self.hero_buttons:
-            card_widget.setProperty("selected", False)
-            card_widget.style().unpolish(card_widget)
-            card_widget.style().polish(card_widget)
-        
-        # 设置当前选择
-        widget.setProperty("selected", True)
-        widget.style().unpolish(widget)
-        widget.style().polish(widget)
+            set_style_state(card_widget, "selected", card_widget is widget)
         
         self.selected_hero = hero_name
         self.start_button.setEnabled(True)
@@ -662,14 +1159,24 @@ class SelectHeroDialog(QDialog):
         num_others = 2 
         if len(remaining_heroes) < num_others:
             # 如果不够，允许重复选择
-            other_heros = random.choices(remaining_heroes, k=num_others)
+            other_heros = self.rng.choices(remaining_heroes, k=num_others)
         else:
-            other_heros = random.sample(remaining_heroes, k=num_others)
+            other_heros = self.rng.sample(remaining_heroes, k=num_others)
             
         self.main_window.start_game(player_hero, other_heros)
         self.accept()
 
 class MainWindow(QWidget):
+    # 界面刷新标志位
+    REFRESH_DRAW_PILE = 1
+    REFRESH_PLAYERS = 2
+    REFRESH_CENTER = 4
+    REFRESH_INFO = 8
+    REFRESH_HISTORY = 16
+    REFRESH_ROUND = 32  # 整个回合界面（包含以上全部，以及手牌与操作按钮）
+
+    RESIZE_DEBOUNCE_MS = 120
+
     def __init__(self):
         super().__init__()
         # 基础尺寸与缩放初始化
@@ -680,8 +1187,8 @@ class MainWindow(QWidget):
         self.scale_factor = 1.0
         self.scaled_components = []  # 需要缩放组件注册
 
-        # 历史记录（仅作缓存，真实数据在 game.history_lines）
-        self.history_lines = []
+        # 随机数生成器：选将与每局对局种子都由它派生
+        self.rng = random.Random()
 
         # 窗口属性
         self.setWindowTitle('Trino 游戏')
@@ -695,6 +1202,10 @@ class MainWindow(QWidget):
         self.allow_manual_end = False
         # 是否处于主菜单（用于中断任何仍在排队的计时回调）
         self.in_main_menu = False
+        # 待刷新的界面部分（REFRESH_* 位标志），同一事件循环周期内的通知合并为一次刷新
+        self._dirty = 0
+        self._dirty_players = set()
+        self._refresh_scheduled = False
 
         # 全局样式（对话框更明亮）
         QApplication.instance().setStyleSheet("""
@@ -705,7 +1216,18 @@ class MainWindow(QWidget):
             }
             QDialog QPushButton:hover, QMessageBox QPushButton:hover, QInputDialog QPushButton:hover { background-color: #e1e1e1; }
             QListWidget, QComboBox, QLineEdit { background-color: white; color: black; border: 1px solid #adadad; }
-        """)
+        """ + THEME_STYLESHEET)
+
+        # 窗口缩放：拖动或切换全屏时合并为一次，停止变化 RESIZE_DEBOUNCE_MS 毫秒后再处理
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(self.RESIZE_DEBOUNCE_MS)
+        self._resize_timer.timeout.connect(self._apply_resize)
+        self._background_source = None  # 已解码的背景原图
+        self._background_size = None    # 当前背景已缩放到的窗口尺寸
+
+        # AI决策在工作线程中进行，界面在AI思考期间保持响应
+        self.ai_runner = AIDecisionRunner(self)
 
         # 主布局与基本容器
         self.main_layout = QVBoxLayout(self)
@@ -831,14 +1353,15 @@ class MainWindow(QWidget):
                 scaled_height = int(base_size[1] * self.scale_factor)
                 component.setFixedSize(scaled_width, scaled_height)
             
-            # 缩放字体
-            if base_font_size and hasattr(component, 'setStyleSheet'):
-                scaled_font_size = int(base_font_size * self.scale_factor)
+            # 缩放字体：通过 QFont 设置像素大小，不再改写样式表
+            if base_font_size:
                 current_style = component.styleSheet()
-                # 更新字体大小
-                import re
-                current_style = re.sub(r'font-size:\s*\d+px', f'font-size: {scaled_font_size}px', current_style)
-                component.setStyleSheet(current_style)
+                if 'font-size' in current_style:
+                    # 样式表中的字号会覆盖 setFont，首次缩放时移除一次即可
+                    component.setStyleSheet(_FONT_SIZE_RE.sub('', current_style))
+                font = component.font()
+                font.setPixelSize(max(1, int(base_font_size * self.scale_factor)))
+                component.setFont(font)
         except RuntimeError:
             # 组件已被删除，忽略错误
             pass
@@ -877,7 +1400,12 @@ class MainWindow(QWidget):
         self.apply_scaling_to_component(component, base_size, base_font_size)
 
     def resizeEvent(self, event):
-        """处理窗口大小改变事件，重新设置背景和缩放"""
+        """处理窗口大小改变事件：拖动过程中只重启计时器，停下后按最终尺寸统一缩放和重设背景"""
+        super().resizeEvent(event)
+        self._resize_timer.start()
+
+    def _apply_resize(self):
+        """按窗口最终尺寸更新缩放与背景"""
         # 计算新的缩放因子
         new_scale_factor = self.calculate_scale_factor()
         
@@ -887,16 +1415,18 @@ class MainWindow(QWidget):
             self.update_all_scaled_components()
         
         self._init_background()
-        super().resizeEvent(event)
 
     def _init_background(self):
-        """初始化并设置窗口背景图片"""
+        """初始化并设置窗口背景图片（原图只解码一次，同一窗口尺寸只缩放一次）"""
+        if self._background_source is None:
+            self._background_source = QPixmap(resource_path(os.path.join('images', 'background.jpg')))
+        if self._background_source.isNull() or self._background_size == self.size():
+            return
+        self._background_size = self.size()
         palette = QPalette()
-        pixmap = QPixmap(resource_path(os.path.join('images', 'background.jpg')))
-        if not pixmap.isNull():
-            brush = QBrush(pixmap.scaled(self.size(), Qt.KeepAspectRatioByExpanding))
-            palette.setBrush(QPalette.Window, brush)
-            self.setPalette(palette)
+        brush = QBrush(self._background_source.scaled(self.size(), Qt.KeepAspectRatioByExpanding))
+        palette.setBrush(QPalette.Window, brush)
+        self.setPalette(palette)
 
     def show_main_menu(self):
         """显示主菜单"""
@@ -954,7 +1484,6 @@ class MainWindow(QWidget):
             padding_v = 8
             min_h = 45
         for btn in self.btns:
-            self.add_scaled_component(btn, base_size=base_size, base_font_size=font_px)
             btn.setStyleSheet(f"""
                 QPushButton {{
                     font-size: {font_px}px; color: white; background-color: #2980b9; 
@@ -963,6 +1492,7 @@ class MainWindow(QWidget):
                 }}
                 QPushButton:hover {{ background-color: #3498db; }}
             """)
+            self.add_scaled_component(btn, base_size=base_size, base_font_size=font_px)
             menu_layout.addWidget(btn)
 
         self.main_layout.addWidget(menu_widget, alignment=Qt.AlignCenter)
@@ -1056,8 +1586,7 @@ class MainWindow(QWidget):
         draw_pile_layout.setAlignment(Qt.AlignCenter)
         
         self.draw_pile_image = QLabel()
-        back_pixmap = QPixmap(get_card_image_path(None)) # 获取牌背图片
-        self.draw_pile_image.setPixmap(back_pixmap.scaled(80, 120, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        self.draw_pile_image.setPixmap(card_pixmap(None, 80, 120)) # 牌背图片
         
         self.draw_pile_count = QLabel()
         self.draw_pile_count.setAlignment(Qt.AlignCenter)
@@ -1072,13 +1601,8 @@ class MainWindow(QWidget):
         self.grid_layout.addWidget(self.draw_pile_widget, 1, 0, alignment=Qt.AlignCenter)
 
         # 中心弃牌区 (中间)
-        self.center_card_widget = QWidget()
-        self.center_card_area_layout = QVBoxLayout(self.center_card_widget)
-        self.center_card_area_layout.setAlignment(Qt.AlignTop)  # 顶部对齐，让弃牌堆在顶部
+        self.center_card_widget = CenterStackWidget()
         self.center_card_widget.setMinimumSize(600, 700)  # 大幅增大最小尺寸，更符合三国杀风格
-        # 调整垂直对齐，让弃牌堆更靠上
-        self.center_card_area_layout.setContentsMargins(0, 100, 0, 0)  # 增加顶部边距，让弃牌堆更靠上
-        self.center_card_area_layout.setAlignment(Qt.AlignTop)  # 改为顶部对齐，让弃牌堆在顶部
         self.grid_layout.addWidget(self.center_card_widget, 1, 1, 1, 3) # 占据中间3列
 
         # 信息区 (右侧)
@@ -1150,11 +1674,9 @@ class MainWindow(QWidget):
         self.player_widgets[main_player_pos] = main_player_widget
         self.bottom_area.addWidget(main_player_widget, 0, 0, 2, 1) # (row, col, rowspan, colspan)
 
-        # 手牌区
-        self.card_area = QWidget()
-        self.card_area_layout = QHBoxLayout(self.card_area)
-        self.card_area_layout.setSpacing(-30) # 回调到原始间距
-        self.card_area_layout.setAlignment(Qt.AlignCenter)
+        # 手牌区（整块绘制，不再为每张牌创建按钮）
+        self.card_area = HandWidget()
+        self.card_area.cardClicked.connect(self.on_card_clicked)
         self.bottom_area.addWidget(self.card_area, 0, 1, 2, 3)
         
         # 操作区和技能区 - 重新设计布局
@@ -1212,20 +1734,33 @@ class MainWindow(QWidget):
         self.top_area.addWidget(self.exit_btn, 0, Qt.AlignTop | Qt.AlignRight)
 
     # 加历史记录
-    def on_history_updated(self, message):
-        """Game 调用：同步历史记录到GUI并更新按钮计数"""
-        if hasattr(self, 'game') and self.game:
-            self.history_lines = list(self.game.history_lines)
+    def _history_count(self):
+        """当前保留的历史记录条数"""
+        game = getattr(self, 'game', None)
+        return len(game.history) if game else 0
+
+    def on_history_updated(self, event):
+        """Game 调用：只更新按钮计数，事件文字在打开历史面板时才渲染"""
+        self.invalidate(self.REFRESH_HISTORY)
+
+    def update_history_button(self):
+        """更新历史按钮上的条数，并同步已打开的历史面板"""
         if hasattr(self, 'history_btn') and self.history_btn:
             try:
-                self.history_btn.setText(f'📜 历史 ({len(self.history_lines)})')
+                self.history_btn.setText(f'📜 历史 ({self._history_count()})')
             except RuntimeError:
                 pass
+        if getattr(self, '_history_dialog', None):
+            self._history_dialog.model.sync()
 
     def show_history_dialog(self):
-        """显示历史记录对话框"""
-        dialog = HistoryDialog(self.history_lines, self)
-        dialog.exec_()
+        """显示历史记录对话框（对话框打开期间新产生的记录会同步追加）"""
+        history = self.game.history if getattr(self, 'game', None) else EventLog()
+        self._history_dialog = HistoryDialog(history, self)
+        try:
+            self._history_dialog.exec_()
+        finally:
+            self._history_dialog = None
 
 
     
@@ -1237,8 +1772,9 @@ class MainWindow(QWidget):
         if not self.isFullScreen():
             self.showFullScreen()
         
-        # 清空历史记录
-        self.history_lines = []  # 清空本地缓存（Game 会重新推送）
+        # 结束上一局的历史落盘（新一局有独立的历史记录）
+        if getattr(self, 'game', None):
+            self.game.history.close()
 
         # 清空缩放组件列表，避免内存泄漏
         self.scaled_components.clear()
@@ -1249,7 +1785,7 @@ class MainWindow(QWidget):
         num_players = len(other_heros) + 1
         # 检查是否为测试模式
         test_mode = hasattr(self, 'selected_mode') and self.selected_mode == '测试模式'
-        self.game = Game(player_num=num_players, test_mode=test_mode)
+        self.game = Game(player_num=num_players, test_mode=test_mode, seed=self.rng.randrange(2**32))
         self.game.set_gui(self)
 
         # 进入游戏状态
@@ -1272,7 +1808,7 @@ class MainWindow(QWidget):
 
         # 5. 更新历史记录按钮文本
         if hasattr(self, 'history_btn'):
-            self.history_btn.setText(f'📜 历史 ({len(self.history_lines)})')
+            self.history_btn.setText(f'📜 历史 ({self._history_count()})')
 
         # 6. 启动标准游戏流程（在GUI模式下使用异步方式）
         self.start_standard_game_loop()
@@ -1315,6 +1851,17 @@ class MainWindow(QWidget):
         """安排AI回合执行"""
         QTimer.singleShot(delay_ms, self.execute_game_loop_step)
 
+    def request_ai_decision(self, player, view, game_state):
+        """把AI决策提交到工作线程；结果回到GUI线程时若对局已更换或已返回主菜单则丢弃"""
+        game = self.game
+
+        def apply(action_type, action_value):
+            if self.game is not game or self.in_main_menu or game.game_over:
+                return
+            game.apply_ai_decision(player, action_type, action_value)
+
+        self.ai_runner.request(game.ai_handler, view, game_state, apply)
+
     def schedule_continue_loop(self, delay_ms):
         """安排继续游戏循环"""
         QTimer.singleShot(delay_ms, self.continue_game_loop)
@@ -1337,6 +1884,10 @@ class MainWindow(QWidget):
 
     def show_game_round(self, first_round=False):
         """显示当前回合"""
+        # 本次会重建整个回合界面，之前积累的待刷新标志（历史按钮除外）不再需要
+        self._dirty &= self.REFRESH_HISTORY
+        self._dirty_players.clear()
+
         # 获取当前玩家信息
         player_info = self.game.get_current_player_info()
         player = player_info['player']
@@ -1445,40 +1996,13 @@ class MainWindow(QWidget):
 
     def render_hand_area(self, hand, draw_n, can_draw_chain, enable_click=True):
         """渲染手牌区域"""
-        # 清空旧手牌
-        while self.card_area_layout.count():
-            item = self.card_area_layout.takeAt(0)
-            widget = item.widget()
-            if widget is not None:
-                widget.deleteLater()
-
-        self.card_buttons = []
-        for i, card in enumerate(hand):
-            card_button = QPushButton()
-            card_button.setFixedSize(140, 190)  # 缩小手牌尺寸
-            
-            display_card = card
-            # 如果武圣激活，并且是红色牌，则显示为红+2
-            if self.wusheng_active and card.color == 'red':
-                display_card = UnoCard('draw2', 'red', 0)
-
-            # 加载并缩放图片
-            pixmap = QPixmap(get_card_image_path(display_card))
-            scaled_pixmap = pixmap.scaled(140, 190, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            icon = QIcon(scaled_pixmap)
-            card_button.setIcon(icon)
-            card_button.setIconSize(QSize(140, 190))  # 让图标完全填充按钮尺寸，确保图片显示完整
-            
-            # 应用当前的高亮状态
-            if hasattr(self, 'selected_card_idx') and self.selected_card_idx == i:
-                card_button.setStyleSheet("background-color: #f39c12; border: 2px solid #e67e22; border-radius: 5px;")
-            else:
-                card_button.setStyleSheet("background-color: transparent; border: none;")
-                
-            if enable_click:
-                card_button.clicked.connect(lambda _, idx=i: self.on_card_clicked(idx))
-            self.card_buttons.append(card_button)
-            self.card_area_layout.addWidget(card_button)
+        # 如果武圣激活，红色牌显示为红+2
+        if self.wusheng_active:
+            display_cards = [WUSHENG_CARD if card.color == 'red' else card for card in hand]
+        else:
+            display_cards = hand
+        self.card_area.set_cards(display_cards, clickable=enable_click,
+                                 selected_idx=getattr(self, 'selected_card_idx', None))
 
     def render_action_area(self, is_forced_draw_pending=False, can_play=True, is_current_player_turn=True):
         """渲染操作按钮区域"""
@@ -1621,48 +2145,8 @@ class MainWindow(QWidget):
         self.my_skill_label.setText(skill_text)
 
     def show_center_card_stack(self):
-        """显示中央弃牌堆的牌，通过手动计算位置来实现精确的堆叠和居中。"""
-        # 清理旧的卡牌标签
-        for label in self.center_card_widget.findChildren(QLabel):
-            label.deleteLater()
-
-        cards_to_show = self.game.playedcards.get_last_cards(5)
-        if not cards_to_show:
-            return
-
-        card_width, card_height = 150, 225
-        y_offset_step = 8   # 大幅减小垂直偏移，形成紧凑堆叠
-        x_offset_step = 5   # 增加一个小的水平偏移
-
-        container_width = self.center_card_widget.width()
-        container_height = self.center_card_widget.height()
-
-        # 计算整个牌堆的总高度和宽度
-        num_cards = len(cards_to_show)
-        total_stack_height = card_height + (num_cards - 1) * y_offset_step
-        total_stack_width = card_width + (num_cards - 1) * x_offset_step
-
-        # 计算第一张牌的起始位置，以使整个牌堆居中
-        base_x = (container_width - total_stack_width) // 2
-        base_y = (container_height - total_stack_height) // 2
-
-        # 从底层到顶层创建和放置卡牌
-        for i, card in enumerate(cards_to_show):
-            card_label = QLabel(self.center_card_widget) # 指定父控件
-            pixmap = QPixmap(get_card_image_path(card)).scaled(card_width, card_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            card_label.setPixmap(pixmap)
-            card_label.setFixedSize(card_width, card_height)
-            
-            # 添加边框以区分卡牌
-            card_label.setStyleSheet("border: 1px solid rgba(255, 255, 255, 0.5); border-radius: 8px;")
-
-            # 计算当前卡牌的位置，加入水平和垂直偏移
-            x_pos = base_x + i * x_offset_step
-            y_pos = base_y + i * y_offset_step
-            card_label.move(x_pos, y_pos)
-            
-            card_label.show()
-            card_label.raise_() # 确保后添加的牌在上面
+        """显示中央弃牌堆最上面的5张牌（牌没有变化时不重绘）"""
+        self.center_card_widget.set_cards(self.game.playedcards.get_last_cards(5))
 
     def on_skill_button_clicked(self):
         """处理技能按钮的点击事件"""
@@ -1888,10 +2372,9 @@ class MainWindow(QWidget):
             """)
             
             # 设置卡牌图片
-            card_image_path = get_card_image_path(card)
-            if os.path.exists(card_image_path):
-                pixmap = QPixmap(card_image_path)
-                card_btn.setIcon(QIcon(pixmap.scaled(70, 110, Qt.KeepAspectRatio, Qt.SmoothTransformation)))
+            pixmap = card_pixmap(card, 70, 110)
+            if not pixmap.isNull():
+                card_btn.setIcon(QIcon(pixmap))
                 card_btn.setIconSize(QSize(70, 110))
             
             # 连接点击事件
@@ -2031,10 +2514,9 @@ class MainWindow(QWidget):
             """)
             
             # 设置卡牌图片
-            card_image_path = get_card_image_path(card)
-            if os.path.exists(card_image_path):
-                pixmap = QPixmap(card_image_path)
-                card_btn.setIcon(QIcon(pixmap.scaled(70, 110, Qt.KeepAspectRatio, Qt.SmoothTransformation)))
+            pixmap = card_pixmap(card, 70, 110)
+            if not pixmap.isNull():
+                card_btn.setIcon(QIcon(pixmap))
                 card_btn.setIconSize(QSize(70, 110))
             
             # 连接点击事件
@@ -2287,8 +2769,7 @@ class MainWindow(QWidget):
         card_to_check = card
         # If WuSheng is active and the card is red, check validity as a virtual red +2 card
         if self.wusheng_active and card.color == 'red':
-            from card import UnoCard
-            card_to_check = UnoCard('draw2', 'red', 0)
+            card_to_check = WUSHENG_CARD
 
         # Enable play button only if the card is valid to play
         if hasattr(self, 'play_btn'):
@@ -2298,16 +2779,11 @@ class MainWindow(QWidget):
 
     def highlight_selected_card(self, idx):
         """高亮显示选中的卡牌"""
-        # 重置所有卡牌的高亮状态
-        for i, btn in enumerate(self.card_buttons):
-            try:
-                if i == idx:
-                    btn.setStyleSheet("background-color: #f39c12; border: 2px solid #e67e22; border-radius: 5px;")
-                else:
-                    btn.setStyleSheet("background-color: transparent; border: none;")
-            except RuntimeError:
-                # 按钮已被删除，忽略错误
-                continue
+        try:
+            self.card_area.set_selected(idx)
+        except (AttributeError, RuntimeError):
+            # 手牌区尚未创建或已被删除，忽略
+            pass
         self.selected_card_idx = idx
 
     def show_temporary_message(self, message, duration=800):
@@ -2571,12 +3047,15 @@ class MainWindow(QWidget):
     def show_select_hero(self):
         """显示武将选择对话框"""
         select_dialog = SelectHeroDialog(self)
+        select_dialog.setAttribute(Qt.WA_DeleteOnClose)
         select_dialog.exec_()
 
     def show_hero_dialog(self):
         """显示武将图鉴对话框"""
         from mr_cards import all_heroes
         dialog = QDialog(self)
+        # 关闭后销毁，否则每次打开都会留下一整套控件
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
         dialog.setWindowTitle('武将图鉴')
         dialog.setStyleSheet("background-color: white;")
         dialog.resize(1400, 900)
@@ -2601,9 +3080,10 @@ class MainWindow(QWidget):
 
             # 武将图片
             img_label = QLabel()
-            if hero_card.image_path and os.path.exists(resource_path(os.path.join('images', hero_card.image_path))):
-                pixmap = QPixmap(resource_path(os.path.join('images', hero_card.image_path)))
-                img_label.setPixmap(pixmap.scaled(180, 252, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+            image_path = get_hero_image_path(hero_card)
+            if image_path:
+                # 占位先行，滚动到可见范围时才在后台线程解码
+                portrait_loader().bind(img_label, image_path, 180, 252, lazy=True)
             else:
                 img_label.setText("无图片")
                 img_label.setFixedSize(180, 252)
@@ -2641,6 +3121,7 @@ class MainWindow(QWidget):
             grid_layout.addWidget(hero_box, row, col)
 
         scroll.setWidget(content_widget)
+        portrait_loader().watch(scroll)
 
         # 集成“标签说明”到武将图鉴中（可展开/收起）
         tag_desc_text = (
@@ -2914,47 +3395,73 @@ class MainWindow(QWidget):
 
         dialog.exec_()
 
+    # ==================== 合并刷新 ====================
+    def invalidate(self, flags, player=None):
+        """标记界面需要刷新的部分，在下一次事件循环时统一刷新一次。
+        一次摸牌会连续触发摸牌、手牌变化、牌堆变化等多个通知，这里只记录标志，不立即重绘。"""
+        self._dirty |= flags
+        if player is not None:
+            self._dirty_players.add(player)
+        if not self._refresh_scheduled:
+            self._refresh_scheduled = True
+            QTimer.singleShot(0, self._flush_refresh)
+
+    def _flush_refresh(self):
+        """按累积的标志执行一次刷新"""
+        self._refresh_scheduled = False
+        flags, self._dirty = self._dirty, 0
+        players, self._dirty_players = self._dirty_players, set()
+        if not getattr(self, 'game', None) or self.in_main_menu:
+            return
+        try:
+            if flags & self.REFRESH_HISTORY:
+                self.update_history_button()
+            if flags & self.REFRESH_ROUND and not self.game.game_over:
+                # 整个回合界面重建时已包含其余部分
+                self.show_game_round()
+                return
+            if flags & self.REFRESH_DRAW_PILE:
+                self.update_draw_pile_count()
+            if flags & self.REFRESH_PLAYERS:
+                for player in players:
+                    self.update_player_hand_display(player)
+            if flags & self.REFRESH_CENTER:
+                self.show_center_card_stack()
+            if flags & self.REFRESH_INFO:
+                self.render_info_area()
+        except RuntimeError:
+            # 界面组件已被删除（如已返回主菜单），静默忽略
+            pass
+
     def on_cards_drawn(self, player, num_cards):
         """当玩家摸牌时更新界面"""
-        # 更新摸牌堆数量显示
-        self.update_draw_pile_count()
-        
-        # 更新玩家手牌显示
-        self.update_player_hand_display(player)
-        
-        # 如果是当前玩家摸牌，刷新界面
+        flags = self.REFRESH_DRAW_PILE | self.REFRESH_PLAYERS
+        # 如果是当前玩家摸牌，刷新整个回合界面
         if player == self.game.get_current_player():
-            self.show_game_round()
+            flags |= self.REFRESH_ROUND
+        self.invalidate(flags, player)
 
     def on_player_hand_changed(self, player):
         """当玩家手牌变化时更新界面"""
-        # 更新玩家手牌显示
-        self.update_player_hand_display(player)
-        
-        # 如果是当前玩家手牌变化，刷新界面
+        flags = self.REFRESH_PLAYERS
+        # 如果是当前玩家手牌变化，刷新整个回合界面
         if player == self.game.get_current_player():
-            self.show_game_round()
+            flags |= self.REFRESH_ROUND
+        self.invalidate(flags, player)
 
     def on_draw_pile_changed(self):
         """当摸牌堆数量变化时更新界面"""
-        self.update_draw_pile_count()
+        self.invalidate(self.REFRESH_DRAW_PILE)
 
     #（重复定义已删除，保留前面的主实现）
 
     def on_game_state_changed(self):
         """当游戏状态变化时更新界面"""
-        # 更新摸牌堆数量
-        self.update_draw_pile_count()
-        
-        # 更新中央牌堆显示
-        self.show_center_card_stack()
-        
-        # 更新信息区域
-        self.render_info_area()
-        
+        flags = self.REFRESH_DRAW_PILE | self.REFRESH_CENTER | self.REFRESH_INFO
         # 如果是人类玩家回合，刷新操作按钮
         if self.game.is_current_player_human():
-            self.show_game_round()
+            flags |= self.REFRESH_ROUND
+        self.invalidate(flags)
 
     def update_player_hand_display(self, player):
         """
@@ -2974,18 +3481,11 @@ class MainWindow(QWidget):
 
     def on_card_played(self, player, card):
         """当玩家出牌时更新界面"""
-        # 更新中央牌堆显示
-        self.show_center_card_stack()
-        
-        # 更新摸牌堆数量显示
-        self.update_draw_pile_count()
-        
-        # 更新玩家手牌显示
-        self.update_player_hand_display(player)
-        
-        # 如果是当前玩家出牌，刷新界面
+        flags = self.REFRESH_CENTER | self.REFRESH_DRAW_PILE | self.REFRESH_PLAYERS
+        # 如果是当前玩家出牌，刷新整个回合界面
         if player == self.game.get_current_player():
-            self.show_game_round()
+            flags |= self.REFRESH_ROUND
+        self.invalidate(flags, player)
 
     def ask_yes_no_question(self, title, question):
         """弹出一个通用的"是/否"对话框"""
@@ -3073,8 +3573,66 @@ class MainWindow(QWidget):
             pass
 
 # 在文件开头添加历史记录对话框类
+class HistoryListModel(QAbstractListModel):
+    """历史记录列表模型：直接读取 Game 的事件缓冲，只在视图请求某一行时才渲染该行文字。
+
+    打开时只载入最近 PAGE_SIZE 条，滚动到顶部时再按页向前载入更早的记录。
+    行号对应事件序号 self._start + row。
+    """
+    PAGE_SIZE = 200
+
+    def __init__(self, history, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self._end = history.total
+        self._start = max(history.first_seq, self._end - self.PAGE_SIZE)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._end - self._start
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        event = self.history.get(self._start + index.row())
+        return event.render() if event is not None else ''
+
+    def has_older(self) -> bool:
+        return self._start > self.history.first_seq
+
+    def fetch_older(self) -> int:
+        """在顶部插入一页更早的记录，返回插入的行数"""
+        count = min(self.PAGE_SIZE, self._start - self.history.first_seq)
+        if count <= 0:
+            return 0
+        self.beginInsertRows(QModelIndex(), 0, count - 1)
+        self._start -= count
+        self.endInsertRows()
+        return count
+
+    def sync(self):
+        """与事件缓冲同步：移除已被挤出缓冲的旧行，追加新记录"""
+        first_seq = self.history.first_seq
+        if self._start < first_seq:
+            dropped = min(first_seq, self._end) - self._start
+            if dropped > 0:
+                self.beginRemoveRows(QModelIndex(), 0, dropped - 1)
+                self._start += dropped
+                self.endRemoveRows()
+            self._start = max(self._start, first_seq)
+            self._end = max(self._end, self._start)
+        total = self.history.total
+        if total > self._end:
+            self.beginInsertRows(QModelIndex(), self._end - self._start, total - self._start - 1)
+            self._end = total
+            self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._start = self._end = self.history.total
+        self.endResetModel()
+
 class HistoryDialog(QDialog):
-    def __init__(self, history_lines, parent=None):
+    def __init__(self, history, parent=None):
         super().__init__(parent)
         self.setWindowTitle('游戏历史记录')
         self.setModal(True)
@@ -3086,7 +3644,7 @@ class HistoryDialog(QDialog):
                 background-color: #2c3e50;
                 color: white;
             }
-            QTextEdit {
+            QListView {
                 background-color: rgba(44, 62, 80, 0.8);
                 color: #f1c40f;
                 border: 2px solid #34495e;
@@ -3094,7 +3652,9 @@ class HistoryDialog(QDialog):
                 padding: 10px;
                 font-family: "隶书", "LiSu", serif;
                 font-size: 24px;
-                line-height: 1.8;
+            }
+            QListView::item {
+                padding: 4px 0px;
             }
             QPushButton {
                 background-color: #3498db;
@@ -3121,17 +3681,23 @@ class HistoryDialog(QDialog):
         title_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(title_label)
         
-        # 历史记录文本区域
-        self.history_text = QTextEdit()
-        self.history_text.setReadOnly(True)
-        self.history_text.setPlainText('\n'.join(history_lines))
+        # 历史记录列表：只渲染可见的行，分批布局
+        self.model = HistoryListModel(history, self)
+        self.history_view = QListView()
+        self.history_view.setModel(self.model)
+        self.history_view.setWordWrap(True)
+        self.history_view.setLayoutMode(QListView.Batched)
+        self.history_view.setBatchSize(50)
+        self.history_view.setSelectionMode(QListView.NoSelection)
+        self.history_view.setFocusPolicy(Qt.NoFocus)
+        self.history_view.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.history_view.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+        self.model.rowsInserted.connect(self._on_rows_appended)
         
-        # 滚动到底部
-        scrollbar = self.history_text.verticalScrollBar()
-        if scrollbar.isVisible():
-            scrollbar.setValue(scrollbar.maximum())
+        # 滚动到底部（最新的记录）
+        QTimer.singleShot(0, self.history_view.scrollToBottom)
         
-        layout.addWidget(self.history_text)
+        layout.addWidget(self.history_view)
         
         # 按钮区域
         button_layout = QHBoxLayout()
@@ -3149,20 +3715,34 @@ class HistoryDialog(QDialog):
         button_layout.addWidget(close_btn)
         
         layout.addLayout(button_layout)
+
+    def _on_scrolled(self, value):
+        """滚动到顶部时向前载入一页更早的记录，并保持当前看到的位置不动"""
+        if value != self.history_view.verticalScrollBar().minimum() or not self.model.has_older():
+            return
+        inserted = self.model.fetch_older()
+        if inserted:
+            self.history_view.scrollTo(self.model.index(inserted, 0), QListView.PositionAtTop)
+
+    def _on_rows_appended(self, parent, first, last):
+        """新记录追加到末尾时，如果原本就停在底部则跟随滚动（向前分页插入在顶部，不处理）"""
+        if last != self.model.rowCount() - 1:
+            return
+        scrollbar = self.history_view.verticalScrollBar()
+        if scrollbar.value() >= scrollbar.maximum() - 4:
+            QTimer.singleShot(0, self.history_view.scrollToBottom)
     
     def clear_history(self):
         """清空历史记录"""
-        self.history_text.clear()
         parent = self.parent()
-        if parent and hasattr(parent, 'history_lines'):
-            parent.history_lines.clear()
-            # 同步清空 Game 内部历史（保持数据一致）
-            if hasattr(parent, 'game') and parent.game and hasattr(parent.game, 'history_lines'):
-                parent.game.history_lines.clear()
+        if parent:
+            # 清空 Game 内部历史（已落盘的记录不受影响）
+            if hasattr(parent, 'game') and parent.game:
+                parent.game.history.clear()
             # 刷新按钮计数
             if hasattr(parent, 'history_btn') and parent.history_btn:
                 try:
                     parent.history_btn.setText('📜 历史 (0)')
                 except RuntimeError:
                     pass
-
+        self.model.clear()
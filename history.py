@@ -0,0 +1,146 @@
+"""结构化的游戏事件日志。
+
+出牌、摸牌、跳牌等事件以 GameEvent 的形式记录原始参数，只有在历史面板真正显示时才渲染成文字。
+内存中只保留最近 capacity 条事件（列表实现的环形缓冲，按序号取事件为 O(1)）；如需完整历史用于分析，可指定 spill_path，
+事件会由后台线程异步追加写入 JSON Lines 文件。
+"""
+import json
+import queue
+import threading
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+
+
+class EventKind(str, Enum):
+    PLAY = 'play'
+    DRAW = 'draw'
+    JUMP = 'jump'
+    SKIP = 'skip'
+    REVERSE = 'reverse'
+    SKILL = 'skill'
+    FORCED_DRAW = 'forced_draw'
+    WIN = 'win'
+    UNO = 'uno'
+    RECYCLE = 'recycle'
+    INFO = 'info'
+
+
+@dataclass(slots=True)
+class GameEvent:
+    """一条事件：template 为常量格式串，{actor} 为行动玩家（武将名），其余为位置参数"""
+    kind: EventKind
+    turn: int
+    actor: Optional[str]
+    template: str
+    args: tuple = ()
+
+    def render(self) -> str:
+        if self.actor is None and not self.args:
+            return self.template
+        return self.template.format(*self.args, actor=self.actor)
+
+    def __str__(self):
+        return self.render()
+
+    def to_record(self) -> dict:
+        """转换为可写入JSON的记录（牌、玩家等参数统一转为字符串）"""
+        return {
+            'kind': self.kind.value,
+            'turn': self.turn,
+            'actor': self.actor,
+            'args': [a if isinstance(a, (int, float, str)) or a is None else str(a) for a in self.args],
+            'text': self.render(),
+        }
+
+
+class _EventSpill:
+    """后台线程将事件追加写入文件，游戏线程只负责入队"""
+    _STOP = object()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='trino-event-spill', daemon=True)
+        self._thread.start()
+
+    def put(self, event: GameEvent):
+        self._queue.put(event)
+
+    def _run(self):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            while True:
+                event = self._queue.get()
+                if event is self._STOP:
+                    break
+                f.write(json.dumps(event.to_record(), ensure_ascii=False))
+                f.write('\n')
+                # 队列暂时空了再刷盘，批量写入
+                if self._queue.empty():
+                    f.flush()
+
+    def close(self):
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+
+class EventLog:
+    """固定容量的事件环形缓冲，可选异步落盘"""
+
+    def __init__(self, capacity: int = 50, spill_path: Optional[str] = None):
+        self._capacity = capacity
+        # 序号为 seq 的事件存放在 _buffer[seq % capacity]；列表长度始终为 min(total, capacity)
+        self._buffer: list[Optional[GameEvent]] = []
+        self._size = 0  # 缓冲中有效的事件数（clear 后归零）
+        # 自开局以来记录的事件总数（含已被挤出缓冲的）
+        self.total = 0
+        self._spill = _EventSpill(spill_path) if spill_path else None
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def first_seq(self) -> int:
+        """内存中最早一条事件的序号（事件按记录顺序从0编号）"""
+        return self.total - self._size
+
+    def get(self, seq: int) -> Optional[GameEvent]:
+        """按序号取事件；已被挤出缓冲或被清空的返回 None"""
+        if self.first_seq <= seq < self.total:
+            return self._buffer[seq % self._capacity]
+        return None
+
+    def append(self, event: GameEvent):
+        index = self.total % self._capacity
+        if index < len(self._buffer):
+            self._buffer[index] = event
+        else:
+            self._buffer.append(event)
+        self.total += 1
+        if self._size < self._capacity:
+            self._size += 1
+        if self._spill is not None:
+            self._spill.put(event)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        buffer, capacity = self._buffer, self._capacity
+        return (buffer[seq % capacity] for seq in range(self.first_seq, self.total))
+
+    def render_lines(self) -> list[str]:
+        """渲染内存中的全部事件，仅在显示历史面板时调用"""
+        return [event.render() for event in self]
+
+    def clear(self):
+        """清空内存中的事件（已落盘的内容不受影响）"""
+        self._buffer = [None] * len(self._buffer)
+        self._size = 0
+
+    def close(self):
+        """结束落盘线程，确保已记录的事件全部写入文件"""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
@@ -0,0 +1,257 @@
+"""LLM 对话接口的 HTTP 客户端。
+
+所有 LLM 电脑玩家共用同一个带连接池的 requests.Session（keep-alive，不必每步重新握手），
+请求带显式的连接/读取超时，失败后按指数退避重试；连续失败达到阈值后熔断一段时间，
+期间直接返回 None，由调用方退回规则AI，不再让每一步都等满超时。
+
+chat_stream() 使用流式（server-sent events）模式，边接收边交给调用方解析，
+一旦解析出完整的决策就断开连接，不必等整段回复生成完毕。
+
+可以用 llm_stub.py 在本地起一个假的接口服务，离线测量每步决策的延迟：
+    python llm_stub.py --port 8765 --delay 0.3
+    python trino_sim.py --games 20 --workers 1 --llm-url http://127.0.0.1:8765/v1/chat/completions
+"""
+import time
+import json
+import threading
+import unicodedata
+from typing import Optional
+
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 20.0
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+# 这些状态码视为临时故障，值得重试
+RETRY_STATUS = frozenset((408, 429, 500, 502, 503, 504))
+
+
+def estimate_tokens(messages) -> int:
+    """粗略估计消息的 token 数：中日韩文字按每字1个，其余字符按每4个1个，另加每条消息的格式开销"""
+    total = 0
+    for message in messages:
+        text = message['content']
+        wide = sum(1 for ch in text if unicodedata.east_asian_width(ch) in 'WF')
+        total += wide + (len(text) - wide + 3) // 4 + 4
+    return total
+
+
+class CircuitBreaker:
+    """连续失败 failure_threshold 次后断开 reset_timeout 秒；到时放行一次试探请求，成功则恢复"""
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                return True
+            if self.state == self.HALF_OPEN:
+                # 试探请求尚未返回，其余请求继续走后备
+                return False
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class RequestStats:
+    """请求延迟统计（秒），用于离线测量每步决策耗时"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """清零全部计数（共享客户端跨多批模拟复用时，每批开始前调用）"""
+        with self._lock:
+            self.calls = 0
+            self.failures = 0
+            self.rejected = 0  # 熔断期间未发出的请求
+            self.early_stops = 0  # 流式请求在回复结束前就得到决策的次数
+            self.prompt_tokens = 0  # 已发出请求的提示词 token 数（估计值）
+            self.total_seconds = 0.0
+            self.max_seconds = 0.0
+
+    def record(self, seconds: float, ok: bool):
+        with self._lock:
+            self.calls += 1
+            if not ok:
+                self.failures += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+
+    def record_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def record_prompt(self, tokens: int):
+        with self._lock:
+            self.prompt_tokens += tokens
+
+    def record_early_stop(self):
+        with self._lock:
+            self.early_stops += 1
+
+    def to_dict(self) -> dict:
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'rejected': self.rejected,
+            'early_stops': self.early_stops,
+            'prompt_tokens': self.prompt_tokens,
+            'total_seconds': self.total_seconds,
+            'max_seconds': self.max_seconds,
+        }
+
+
+class LLMClient:
+    """chat/completions 接口客户端，线程安全（AI决策运行在工作线程中）"""
+
+    def __init__(self, api_url: str, api_key: str = '', connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT, max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff: float = DEFAULT_BACKOFF, breaker: CircuitBreaker = None):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = RequestStats()
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests  # 仅LLM模式需要，避免无GUI批量模拟时引入网络依赖
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    session.headers.update({
+                        'Authorization': f'Bearer {self.api_key}',
+                        'Content-Type': 'application/json',
+                    })
+                    self._session = session
+        return self._session
+
+    def chat(self, messages, **params) -> Optional[str]:
+        """发送一次对话请求，返回回复文本；失败或熔断中返回 None"""
+        data = {"model": "deepseek-chat", "messages": messages, **params}
+        return self._post(data, self._read_message)
+
+    def chat_stream(self, messages, parse, **params):
+        """流式对话请求。每收到一段内容就调用 parse(已收到的全部文本, final=False)，
+        返回非 None 时立即断开连接并返回该结果；回复结束时再以 final=True 调用一次。
+        失败或熔断中返回 None"""
+        data = {"model": "deepseek-chat", "messages": messages, "stream": True, **params}
+        return self._post(data, lambda response: self._read_stream(response, parse), stream=True)
+
+    def _read_message(self, response):
+        return response.json()['choices'][0]['message']['content']
+
+    def _read_stream(self, response, parse):
+        text = ''
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith('data:'):
+                continue
+            payload = line[5:].strip()
+            if payload == '[DONE]':
+                break
+            delta = json.loads(payload)['choices'][0].get('delta', {}).get('content')
+            if not delta:
+                continue
+            text += delta
+            result = parse(text, False)
+            if result is not None:
+                # 剩余内容不再接收，关闭响应即中止传输
+                self.stats.record_early_stop()
+                return result
+        return parse(text, True)
+
+    def _post(self, data, read, stream=False):
+        """带超时、重试与熔断的 POST；read(response) 的返回值即为结果"""
+        if not self.breaker.allow():
+            self.stats.record_rejected()
+            return None
+        import requests
+        # 可重试的临时故障：连接失败、超时、流式传输中途断开
+        transient = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+        self.stats.record_prompt(estimate_tokens(data['messages']))
+        start = time.perf_counter()
+        ok = False
+        try:
+            for attempt in range(self.max_retries + 1):
+                retry = False
+                try:
+                    response = self.session.post(self.api_url, json=data, timeout=self.timeout, stream=stream)
+                    with response:
+                        if response.status_code == 200:
+                            result = read(response)
+                            ok = True
+                            return result
+                        print("AI请求失败：", response.status_code, response.text[:200])
+                        retry = response.status_code in RETRY_STATUS
+                except transient as e:
+                    print(f"AI请求失败：{e}")
+                    retry = True
+                except requests.RequestException as e:
+                    print(f"AI请求失败：{e}")
+                except (ValueError, KeyError, IndexError, TypeError) as e:
+                    print(f"AI返回格式错误：{e}")
+                if not retry or attempt == self.max_retries:
+                    break
+                time.sleep(self.backoff * (2 ** attempt))
+            return None
+        except Exception as e:
+            print(f"AI请求异常：{e}")
+            return None
+        finally:
+            # 除成功外的所有出口都计为一次失败，熔断器不会停在半开状态
+            if ok:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            self.stats.record(time.perf_counter() - start, ok)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def shared_client(api_url: str, api_key: str = '', **options) -> LLMClient:
+    """同一接口地址与密钥共用一个客户端（连接池与熔断状态）；options 只在首次创建时生效"""
+    key = (api_url, api_key)
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = _CLIENTS[key] = LLMClient(api_url, api_key, **options)
+        return client
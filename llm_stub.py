@@ -0,0 +1,118 @@
+"""本地假 LLM 接口：模拟 chat/completions，用于离线测量决策延迟与验证超时、重试、熔断。
+
+    python llm_stub.py --port 8765 --delay 0.3 --fail-rate 0.1
+
+每个请求等待 delay 秒后回复 answer；按 fail-rate 的概率返回 503。
+请求中带 "stream": true 时以 server-sent events 逐词发送：先发 answer，再发 --trailing 个多余的词
+（模拟模型在决策后继续输出解释），每个词间隔 token-delay 秒，最后发送 [DONE]。
+"""
+import sys
+import json
+import time
+import random
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 才支持 keep-alive，便于验证客户端复用连接
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            request = {}
+        server = self.server
+        server.requests += 1
+        time.sleep(server.delay)
+        if server.rng.random() < server.fail_rate:
+            self._send(503, {'error': 'stub failure'})
+            return
+        if request.get('stream'):
+            self._send_stream()
+            return
+        self._send(200, {
+            'object': 'chat.completion',
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': server.answer},
+                         'finish_reason': 'stop'}],
+        })
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self):
+        server = self.server
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        words = server.answer.split() + ['因为'] * server.trailing
+        try:
+            for i, word in enumerate(words):
+                time.sleep(server.token_delay)
+                delta = {'content': word if i == 0 else ' ' + word}
+                self._write_chunk('data: ' + json.dumps({'object': 'chat.completion.chunk',
+                                                         'choices': [{'index': 0, 'delta': delta}]}) + '\n\n')
+            self._write_chunk('data: [DONE]\n\n')
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端已拿到决策并提前断开
+            server.cancelled += 1
+            self.close_connection = True
+
+    def _write_chunk(self, text):
+        data = text.encode('utf-8')
+        self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(port=8765, delay=0.0, fail_rate=0.0, answer='draw', seed=None, host='127.0.0.1',
+                token_delay=0.0, trailing=0):
+    """创建假接口服务（调用方自行 serve_forever，可放到线程中在进程内使用）"""
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.delay = delay
+    server.fail_rate = fail_rate
+    server.answer = answer
+    server.rng = random.Random(seed)
+    server.token_delay = token_delay
+    server.trailing = trailing
+    server.requests = 0
+    server.cancelled = 0  # 流式回复被客户端提前断开的次数
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='llm-stub', description='本地假 LLM chat/completions 接口')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help='每个请求的模拟延迟（秒）')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='返回503的概率')
+    parser.add_argument('--answer', default='draw', help='固定回复内容')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--token-delay', type=float, default=0.05, help='流式回复中每个词的间隔（秒）')
+    parser.add_argument('--trailing', type=int, default=20, help='流式回复中决策之后多余的词数')
+    args = parser.parse_args(argv)
+
+    server = make_server(args.port, args.delay, args.fail_rate, args.answer, args.seed,
+                         token_delay=args.token_delay, trailing=args.trailing)
+    print(f"假 LLM 接口已启动: http://127.0.0.1:{args.port}/v1/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
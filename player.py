@@ -3,9 +3,9 @@ from typing import List, TYPE_CHECKING
 if TYPE_CHECKING:
     from game import Game
     from mr_cards import MrCard
-from card import UnoCard
-from util import PlayAction
-from PyQt5.QtWidgets import QApplication
+from card import UnoCard, CARDS, WUSHENG_CARD, COLOR_MASKS
+from util import PlayAction, Hand, PlayerView, is_legal_play, legal_play_mask
+from history import EventKind
 
 HAND_LIMIT = 20
 
@@ -14,13 +14,61 @@ class Player:
     
     def __init__(self, position: int, team: str = None):
         self.position = position
-        self.uno_list: List[UnoCard] = []
+        self.uno_list: List[UnoCard] = []  # 实际存储为 util.Hand，见 uno_list 属性
         self.game: Game = None
         self.mr_card: MrCard = None
         self.team = team
         self.uno_state = False  # 添加uno状态，当手牌为1时激活
 
     # ==================== 1. 基础属性和初始化 ====================
+    @property
+    def uno_list(self) -> Hand:
+        """手牌（util.Hand，额外维护卡牌id位图）"""
+        return self._hand
+
+    @uno_list.setter
+    def uno_list(self, cards):
+        # 整体替换手牌（如缔盟交换手牌）时，先从跳牌索引中撤下旧手牌的牌面
+        old_hand = getattr(self, '_hand', None)
+        if old_hand is not None:
+            old_hand.owner = None
+            for face in list(old_hand.faces()):
+                self._on_face_removed(face)
+        self._hand = Hand(cards, owner=self)
+
+    def _on_face_added(self, face):
+        """手牌中新出现某牌面时更新 Game 的跳牌索引"""
+        game = getattr(self, 'game', None)
+        if game is not None:
+            game.jump_index.setdefault(face, set()).add(self)
+
+    def _on_face_removed(self, face):
+        """手牌中某牌面全部移出时更新 Game 的跳牌索引"""
+        game = getattr(self, 'game', None)
+        if game is not None:
+            holders = game.jump_index.get(face)
+            if holders is not None:
+                holders.discard(self)
+
+    def _skill_names(self):
+        """武将技能名集合，按 mr_card 缓存"""
+        mr_card = self.mr_card
+        cached = getattr(self, '_skill_names_cache', None)
+        if cached is None or cached[0] is not mr_card:
+            cached = (mr_card, frozenset(s.name for s in mr_card.skills) if mr_card else frozenset())
+            self._skill_names_cache = cached
+        return cached[1]
+
+    def _rule_flags(self):
+        """武将出牌规则标记 (倾国, 龙胆)，避免每次出牌判定都扫描技能"""
+        skill_names = self._skill_names()
+        return '倾国' in skill_names, '龙胆' in skill_names
+
+    def can_wusheng_jump(self, last_card: UnoCard) -> bool:
+        """武圣跳牌：上一张为红+2时，拥有武圣且手中有红色牌即可跳牌"""
+        return (last_card.type == 'draw2' and last_card.color == 'red'
+                and '武圣' in self._skill_names() and bool(self.uno_list.mask & COLOR_MASKS['red']))
+
     @property
     def hand_limit(self):
         """获取玩家的手牌上限"""
@@ -36,7 +84,7 @@ class Player:
             # 如果状态发生变化，可以在这里添加历史记录
             try:
                 if self.game and new_uno_state:
-                    self.game.add_history(f"{self.mr_card.name} 只剩一张手牌！")
+                    self.game.log_event(EventKind.UNO, self, "{actor} 只剩一张手牌！")
                 elif self.game and not new_uno_state and self.uno_state:
                     # 从uno状态退出（手牌从1变为其他数量）
                     pass
@@ -49,9 +97,15 @@ class Player:
         """
         普通玩家回合：skip检查 -> +牌链处理 -> 出牌/摸牌/发动技能三选一 -> 根据打出牌类型更新flag -> 结束回合
         """
+        if self.begin_turn():
+            self.finish_turn(*self._get_player_decision())
+
+    def begin_turn(self) -> bool:
+        """回合中决策之前的部分。返回 True 表示还需要玩家做出出牌/摸牌决策，
+        随后由 finish_turn 执行；返回 False 表示回合已结束（被跳过、强制摸牌或游戏结束）。"""
         # 如果游戏已经结束，则不再继续
         if self.game.game_over:
-            return
+            return False
             
         # 回合开始时的状态重置（原本在next_player方法中）
         self.game.turn_action_taken = False
@@ -63,16 +117,26 @@ class Player:
         
         # 1. skip检查 - 检查当前玩家是否应该被跳过
         if self._check_and_handle_skip():
-            return  # 如果被跳过，回合结束
+            return False  # 如果被跳过，回合结束
         
         # 2. +牌链处理 - 处理强制摸牌
         if self._handle_draw_chain():
             # 如果处理了强制摸牌，回合已经结束，直接返回
-            return
-        
-        # 3. 执行玩家回合内容
-        self.execute_turn_content()
+            return False
         
+        # 3. 执行玩家回合内容（决策之前的部分）
+        if self._prepare_turn_content():
+            return True
+        self._end_turn()
+        return False
+
+    def finish_turn(self, action_type, action_value):
+        """执行玩家决策并结束回合（begin_turn 返回 True 之后调用）"""
+        self._complete_turn_content(action_type, action_value)
+        self._end_turn()
+
+    def _end_turn(self):
+        """回合收尾"""
         # 4. 根据打出牌类型更新flag
         self._update_flags_after_turn()
         
@@ -114,7 +178,7 @@ class Player:
         if self.game.skip:
             print(f"玩家 {self.position+1} ({self.mr_card.name}) 被跳过")
             # 记录跳过历史
-            self.game.add_history(f"{self.mr_card.name} 被跳过！")
+            self.game.log_event(EventKind.SKIP, self, "{actor} 被跳过！")
             if self.game.gui:
                 # 在GUI中显示跳过信息
                 self.game.gui.show_temporary_message(f"玩家 {self.position + 1} ({self.mr_card.name}) 被跳过！")
@@ -190,9 +254,14 @@ class Player:
         """
         执行一个玩家在一个回合内的全部内容，不包括跳牌与切换至下一个玩家
         """
+        if self._prepare_turn_content():
+            self._complete_turn_content(*self._get_player_decision())
+
+    def _prepare_turn_content(self) -> bool:
+        """回合开始时的检查与强制摸牌。返回 True 表示接下来需要玩家决策"""
         # 如果游戏已经结束，则不再继续
         if self.game.game_over:
-            return
+            return False
             
         # 1. 回合开始时的检查
         # 检查恃才技能（UNO提醒）
@@ -202,8 +271,8 @@ class Player:
         if len(self.uno_list) > self.hand_limit:
             num_to_discard = len(self.uno_list) - self.hand_limit
             cards_to_discard = self.choose_cards_to_discard(num_to_discard)
-            self.fold_card_objects([self.uno_list[i] for i in cards_to_discard])
             discard_info = ', '.join(str(self.uno_list[i]) for i in cards_to_discard)
+            self.fold_card_objects([self.uno_list[i] for i in cards_to_discard])
             message = f"玩家 {self.position+1} ({self.mr_card.name}) 回合开始时手牌超限，弃置了: {discard_info}"
             if self.game.gui:
                 self.game.gui.show_message_box("操作", message)
@@ -243,11 +312,13 @@ class Player:
             
             # 强制摸牌后，回合结束
             self.game.turn_action_taken = True
-            return
+            return False
 
-        # 3. 获取玩家决策（摸牌或出牌）
-        action_type, action_value = self._get_player_decision()
-        
+        # 3. 接下来需要玩家决策（摸牌或出牌）
+        return True
+
+    def _complete_turn_content(self, action_type, action_value):
+        """执行玩家决策及出牌后的技能效果"""
         # 4. 执行玩家决策
         self._execute_player_decision(action_type, action_value)
         
@@ -294,20 +365,19 @@ class Player:
         potential_jumps = []
         if not last_card:
             return potential_jumps
+        # 快速排除：手中既没有相同牌面，也不能武圣跳牌
+        wusheng_jump = self.can_wusheng_jump(last_card)
+        if not wusheng_jump and not self.uno_list.has_face(last_card.face):
+            return potential_jumps
 
         for i, card in enumerate(self.uno_list):
-            # 1. 标准跳牌: 颜色、类型、数值完全一致（黑色牌不能跳牌）
-            if (card.color == last_card.color and card.type == last_card.type and card.value == last_card.value and 
-                card.type not in ['wild', 'wild_draw4']):
+            # 1. 标准跳牌: 颜色、类型、数值完全一致，即牌面id相同（黑色牌不能跳牌）
+            if card.face == last_card.face and card.type not in ['wild', 'wild_draw4']:
                 potential_jumps.append({'original_card': card, 'virtual_card': None})
 
             # 2. 武圣跳牌:  红色牌 跳 红色+2
-            if last_card.type == 'draw2' and last_card.color == 'red':
-                if self.mr_card and any(s.name == '武圣' for s in self.mr_card.skills):
-                    if card.color == 'red' and card.type not in ['wild', 'wild_draw4']:
-                        from card import UnoCard # 确保 UnoCard 被导入
-                        virtual_card = UnoCard('draw2', 'red', 0)
-                        potential_jumps.append({'original_card': card, 'virtual_card': virtual_card})
+            if wusheng_jump and card.color == 'red' and card.type not in ['wild', 'wild_draw4']:
+                potential_jumps.append({'original_card': card, 'virtual_card': WUSHENG_CARD})
         
         return potential_jumps
 
@@ -328,13 +398,13 @@ class Player:
                     # 记录到历史：达到手牌上限，停止摸牌（技能摸牌也记录，因为这是重要的游戏状态）
                     try:
                         if self.game:
-                            self.game.add_history(f"{self.mr_card.name} 手牌已达上限({self.hand_limit})，停止摸牌")
+                            self.game.log_event(EventKind.DRAW, self, "{actor} 手牌已达上限({})，停止摸牌", self.hand_limit)
                     except RuntimeError:
                         # 如果GUI组件已被删除，静默忽略
                         pass
                     break
-                if self.game.unocard_pack:
-                    cards_drawn.append(self.game.unocard_pack.pop())
+                if self.game.unocard_pack or self.game.recycle_discard_pile():
+                    cards_drawn.append(CARDS[self.game.unocard_pack.pop()])
                 else:
                     break
         
@@ -350,7 +420,7 @@ class Player:
             # 历史记录：摸牌（技能发动的摸牌不记录，避免重复）
             try:
                 if self.game:
-                    self.game.add_history(f"{self.mr_card.name} 摸了 {len(cards_drawn)} 张牌")
+                    self.game.log_event(EventKind.DRAW, self, "{actor} 摸了 {} 张牌", len(cards_drawn))
             except RuntimeError:
                 # 如果GUI组件已被删除，静默忽略
                 pass
@@ -380,7 +450,7 @@ class Player:
             if actual_draw_n < self.game.draw_n:
                 try:
                     if self.game:
-                        self.game.add_history(f"{self.mr_card.name} 强制摸牌时达到手牌上限({self.hand_limit})，只摸了 {actual_draw_n} 张牌")
+                        self.game.log_event(EventKind.FORCED_DRAW, self, "{actor} 强制摸牌时达到手牌上限({})，只摸了 {} 张牌", self.hand_limit, actual_draw_n)
                 except RuntimeError:
                     # 如果GUI组件已被删除，静默忽略
                     pass
@@ -388,11 +458,17 @@ class Player:
             # 如果已经达到手牌上限，记录到历史
             try:
                 if self.game:
-                    self.game.add_history(f"{self.mr_card.name} 手牌已达上限({self.hand_limit})，无法强制摸牌")
+                    self.game.log_event(EventKind.FORCED_DRAW, self, "{actor} 手牌已达上限({})，无法强制摸牌", self.hand_limit)
             except RuntimeError:
                 # 如果GUI组件已被删除，静默忽略
                 pass
         
+        # 统计：将本次强制摸牌归因到+牌来源玩家（须在奸雄/清空+牌串之前）
+        try:
+            self.game.attribute_forced_draw(self, actual_draw_n)
+        except Exception:
+            pass
+
         # 强制摸牌完成后，检查是否有技能可以响应（如奸雄）
         jianxiong_skill = next((s for s in self.mr_card.skills if s.__class__.__name__ == 'JianXiong'), None)
         if jianxiong_skill and self.game.draw_chain_cards:
@@ -412,12 +488,6 @@ class Player:
         # 强制摸牌完成后，结束玩家的回合
         self.game.turn_action_taken = True
 
-        # 统计：将本次强制摸牌归因到+牌来源玩家
-        try:
-            self.game.attribute_forced_draw(self, actual_draw_n)
-        except Exception:
-            pass
-
     # ==================== 5. 出牌相关（默认实现） ====================
     def play(self, card_idx: int, wusheng_active: bool = False):
         """出牌实现"""
@@ -466,7 +536,7 @@ class Player:
         # 检查是否是最后一张黑色牌，如果是则摸一张
         if hasattr(self, '_last_card_is_black') and self._last_card_is_black:
             self.draw_cards(1)
-            self.game.add_history(f"{self.mr_card.name} 打出最后一张黑色牌，摸了一张牌")
+            self.game.log_event(EventKind.DRAW, self, "{actor} 打出最后一张黑色牌，摸了一张牌")
             self._last_card_is_black = False  # 重置标记
 
     def validate_play(self, card_idx: int, wusheng_active: bool):
@@ -477,8 +547,7 @@ class Player:
         original_card = self.uno_list[card_idx]
         card_to_play = original_card
         if wusheng_active and original_card.color == 'red':
-            from card import UnoCard
-            card_to_play = UnoCard('draw2', 'red', 0)
+            card_to_play = WUSHENG_CARD
 
         # 检查是否为跳牌场景：如果是跳牌，则跳过普通出牌规则检查
         is_jump_scenario = False
@@ -509,52 +578,34 @@ class Player:
 
         return True, "有效出牌", card_to_play, original_card
 
+    def legal_play_mask(self) -> int:
+        """当前局面下所有可出卡牌的id位图（与 check_card 规则一致）"""
+        last_card = self.game.playedcards.get_one()
+        stack_type = None
+        if self.game.draw_n > 0 and last_card and last_card.type in ('draw2', 'wild_draw4'):
+            stack_type = last_card.type
+        qingguo, longdan = self._rule_flags()
+        return legal_play_mask(last_card, self.game.cur_color, stack_type, qingguo, longdan)
+
+    def playable_mask(self) -> int:
+        """手牌中可出卡牌的id位图"""
+        return self.uno_list.mask & self.legal_play_mask()
+
     def check_card(self, card: UnoCard):
         """默认的卡牌检查实现"""
+        if card.id is not None:
+            return bool(self.legal_play_mask() >> card.id & 1)
+        # 牌组之外临时构造的牌，直接按规则判定
         last_card = self.game.playedcards.get_one()
-        cur_color = self.game.cur_color
-        
-        # 检查+2/+4叠加规则：只有在draw_n > 0时才应用
-        if self.game.draw_n > 0 and last_card:
-            if last_card.type == 'draw2':
-                # +2上只能叠+2或+4
-                if card.type not in ['draw2', 'wild_draw4']:
-                    return False
-            elif last_card.type == 'wild_draw4':
-                # +4上只能叠+4
-                if card.type != 'wild_draw4':
-                    return False
-        
-        # 检查倾国技能
-        if self.mr_card:
-            qingguo_skill = next((s for s in self.mr_card.skills if s.name == '倾国'), None)
-            if qingguo_skill and card.color == 'blue':
-                return True # 蓝色牌可以当任何颜色出
-
-            # 检查龙胆技能
-            longdan_skill = next((s for s in self.mr_card.skills if s.name == '龙胆'), None)
-            if longdan_skill:
-                if card.color == 'red' and cur_color == 'blue':
-                    return True
-                if card.color == 'blue' and cur_color == 'red':
-                    return True
-
-        if card.type == 'wild' or card.type == 'wild_draw4':
-            return True
-        if card.color == cur_color:
-            return True
-        if last_card and card.type == last_card.type and card.type != 'number':
-            return True
-        if last_card and card.type == 'number' and last_card.type == 'number' and card.value == last_card.value:
-            return True
-        return False
+        stack_type = None
+        if self.game.draw_n > 0 and last_card and last_card.type in ('draw2', 'wild_draw4'):
+            stack_type = last_card.type
+        qingguo, longdan = self._rule_flags()
+        return is_legal_play(card, last_card, self.game.cur_color, stack_type, qingguo, longdan)
 
     def can_play_any_card(self) -> bool:
         """检查手牌中是否有任何可以合法打出的牌"""
-        for card in self.uno_list:
-            if self.check_card(card):
-                return True
-        return False
+        return self.playable_mask() != 0
 
     def play_a_hand(self, i: int):
         """打出一张手牌"""
@@ -590,6 +641,7 @@ class Player:
         for i in indices:
             if i < len(self.uno_list):
                 cards_folded.append(self.uno_list.pop(i))
+        self._discard_folded(cards_folded)
         # 更新uno状态
         self.update_uno_state()
         return cards_folded
@@ -606,8 +658,15 @@ class Player:
                     self.game.gui.show_message_box("警告", f"尝试弃掉不存在的牌 {card}")
                 else:
                     print(f"警告: 尝试弃掉不存在的牌 {card}")
+        self._discard_folded(cards_folded)
         return cards_folded
 
+    def _discard_folded(self, cards: List[UnoCard]):
+        """弃置的牌压入弃牌堆（不作为出牌），摸牌堆耗尽时可洗回"""
+        if self.game:
+            for card in cards:
+                self.game.playedcards.discard(card)
+
     # ==================== 7. 技能相关（抽象方法） ====================
     def execute_skill_jianxiong(self):
         """奸雄技能处理 - 子类需要重写"""
@@ -826,7 +885,7 @@ class Player:
 
         # 2. 将行动信息放入弃牌堆（跳牌时不添加）
         if not is_jump:
-            self.game.playedcards.add_card(effective_card, self, original_card)
+            self.game.playedcards.add_card(effective_card, self, original_card, turn=self.game.turn_count)
             # 统计：记录玩家打出一张牌
             try:
                 self.game.record_play(self)
@@ -842,16 +901,16 @@ class Player:
             if not getattr(self.game, 'suppress_next_play_history', False):
                 if effective_card.type == 'draw2' and effective_card.color == 'red' and original_card.color == 'red' and original_card.type != 'draw2':
                     # 这是武圣技能激活的情况
-                    self.game.add_history(f"{self.mr_card.name} 发动[武圣]技能，将 [{original_card}] 当作 [红+2] 打出 -> {action.target.mr_card.name}")
+                    self.game.log_event(EventKind.PLAY, self, "{actor} 发动[武圣]技能，将 [{}] 当作 [红+2] 打出 -> {}", original_card, action.target.mr_card.name)
                 else:
                     # 正常出牌的历史记录
-                    self.game.add_history(f"{self.mr_card.name} - {original_card} -> {action.target.mr_card.name}")
+                    self.game.log_event(EventKind.PLAY, self, "{actor} - {} -> {}", original_card, action.target.mr_card.name)
             else:
                 # 被跳牌逻辑抑制的第一条正常出牌历史，跳过并重置标志
                 self.game.suppress_next_play_history = False
         else:
             # 跳牌时，只添加弃牌堆信息，不添加历史记录（历史记录在_execute_jump中处理）
-            self.game.playedcards.add_card(effective_card, self, original_card)
+            self.game.playedcards.add_card(effective_card, self, original_card, turn=self.game.turn_count)
 
         # 3. 更新当前颜色
         self._update_color_after_play(effective_card, action.color_choice)
@@ -931,8 +990,7 @@ class Player:
             chosen_color = self.game.gui.choose_color_dialog()
             if chosen_color:
                 return chosen_color
-        import random
-        return random.choice(['red', 'blue', 'yellow', 'green'])
+        return self.game.rng.choice(['red', 'blue', 'yellow', 'green'])
 
     def check_shicai_skill(self):
         """检查恃才技能（UNO提醒）"""
@@ -981,7 +1039,7 @@ class HumanPlayer(Player):
         else:
             print(message)
         # 添加历史记录
-        self.game.add_history(f"{self.mr_card.name} 发动[奸雄]，获得了 {len(cards_to_gain)} 张牌")
+        self.game.log_event(EventKind.SKILL, self, "{actor} 发动[奸雄]，获得了 {} 张牌", len(cards_to_gain))
 
         # 获得牌后，检查手牌上限
         self.check_hand_limit_and_discard_if_needed()
@@ -996,17 +1054,16 @@ class HumanPlayer(Player):
 
     def execute_skill_wusheng(self, card_idx):
         """人类玩家武圣技能处理"""
-        from card import UnoCard
         original_card = self.uno_list.pop(card_idx)
         # 更新uno状态
         self.update_uno_state()
-        wusheng_card = UnoCard('draw2', 'red', 0)
-        self.game.playedcards.add_card(wusheng_card, self, original_card)
+        wusheng_card = WUSHENG_CARD
+        self.game.playedcards.add_card(wusheng_card, self, original_card, turn=self.game.turn_count)
         self.game.cur_color = 'red'
         self.game.change_flag() # 触发+2效果
         print(f"玩家 {self.position+1} 发动【武圣】，将 {original_card} 当作 {wusheng_card} 打出")
         # 添加历史记录
-        self.game.add_history(f"{self.mr_card.name} 发动[武圣]，将 [{original_card}] 当作 [红+2] 打出")
+        self.game.log_event(EventKind.SKILL, self, "{actor} 发动[武圣]，将 [{}] 当作 [红+2] 打出", original_card)
 
     def activate_skill(self, skill_name: str):
         """激活技能 - 人类玩家实现"""
@@ -1102,7 +1159,7 @@ class HumanPlayer(Player):
         discarded_count = len(cards_to_discard)
         if discarded_count > 2:
             self.draw_cards(1, is_skill_draw=True)
-            self.game.add_history(f"{self.mr_card.name} 弃牌数量为{discarded_count}，额外摸了一张牌")
+            self.game.log_event(EventKind.SKILL, self, "{actor} 弃牌数量为{}，额外摸了一张牌", discarded_count)
 
         if self.game.gui:
             self.game.gui.show_message_box("反间成功", f"玩家 {target.position+1} 弃掉了所有 {color_to_discard} 牌。")
@@ -1110,7 +1167,7 @@ class HumanPlayer(Player):
             print(f"反间成功，玩家 {target.position+1} 弃掉了所有 {color_to_discard} 牌。")
         
         # 添加历史记录
-        self.game.add_history(f"{self.mr_card.name} 发动[反间]，玩家 {target.position+1} 弃掉了所有 {color_to_discard} 牌")
+        self.game.log_event(EventKind.SKILL, self, "{actor} 发动[反间]，玩家 {} 弃掉了所有 {} 牌", target.position+1, color_to_discard)
 
         # 检查胜利条件
         if self.game.check_win_condition(self) or self.game.check_win_condition(target):
@@ -1124,12 +1181,11 @@ class HumanPlayer(Player):
         # 从手牌中移除选中的红色牌
         self.play_card_object(card_to_play)
         
-        # 创建一个红+2牌的效果
-        from card import UnoCard
-        red_draw2_card = UnoCard('draw2', 'red', 0)
+        # 使用红+2虚拟牌作为生效牌
+        red_draw2_card = WUSHENG_CARD
         
         # 将红+2牌添加到弃牌堆
-        self.game.playedcards.add_card(red_draw2_card, self, card_to_play)
+        self.game.playedcards.add_card(red_draw2_card, self, card_to_play, turn=self.game.turn_count)
         
         # 更新当前颜色
         self.game.cur_color = 'red'
@@ -1138,7 +1194,7 @@ class HumanPlayer(Player):
         # 不手动调用change_flag()，让process_play_action来处理
         
         # 添加历史记录
-        self.game.add_history(f"{self.mr_card.name} 发动[武圣]，将 [{card_to_play}] 当作 [红+2] 打出")
+        self.game.log_event(EventKind.SKILL, self, "{actor} 发动[武圣]，将 [{}] 当作 [红+2] 打出", card_to_play)
         
         # 设置行动标志
         self.game.turn_action_taken = True
@@ -1162,7 +1218,7 @@ class HumanPlayer(Player):
             self.game.gui.on_player_hand_changed(player2)
         
         # 添加历史记录
-        self.game.add_history(f"{self.mr_card.name} 发动[缔盟]，摸了 {hand_diff} 张牌，玩家 {player1.position+1} 和玩家 {player2.position+1} 交换了手牌")
+        self.game.log_event(EventKind.SKILL, self, "{actor} 发动[缔盟]，摸了 {} 张牌，玩家 {} 和玩家 {} 交换了手牌", hand_diff, player1.position+1, player2.position+1)
         
         # 设置行动标志
         self.game.turn_action_taken = True
@@ -1189,11 +1245,11 @@ class HumanPlayer(Player):
             discarded_count = len(cards_to_discard)
             if discarded_count > 2:
                 self.draw_cards(1, is_skill_draw=True)
-                self.game.add_history(f"{self.mr_card.name} 弃牌数量为{discarded_count}，额外摸了一张牌")
+                self.game.log_event(EventKind.SKILL, self, "{actor} 弃牌数量为{}，额外摸了一张牌", discarded_count)
 
             print(f"AI反间成功，玩家 {target.position+1} 弃掉了所有 {color_to_discard} 牌。")
             # 添加历史记录
-            self.game.add_history(f"{self.mr_card.name} 发动[反间]，玩家 {target.position+1} 弃掉了所有 {color_to_discard} 牌")
+            self.game.log_event(EventKind.SKILL, self, "{actor} 发动[反间]，玩家 {} 弃掉了所有 {} 牌", target.position+1, color_to_discard)
 
         # 检查胜利条件
         if self.game.check_win_condition(self) or self.game.check_win_condition(target):
@@ -1229,7 +1285,7 @@ class HumanPlayer(Player):
             target_player = self.game.gui.choose_target_player_dialog(exclude_self=True)
             if target_player:
                 # 添加历史记录
-                self.game.add_history(f"{self.mr_card.name} 发动[奇袭]，令玩家 {target_player.position+1} 摸了一张牌")
+                self.game.log_event(EventKind.SKILL, self, "{actor} 发动[奇袭]，令玩家 {} 摸了一张牌", target_player.position+1)
                 qixi_skill(card, self, target_player)
                 # 更新目标玩家信息
                 if self.game.gui.player_widgets.get(target_player.position):
@@ -1248,7 +1304,7 @@ class HumanPlayer(Player):
                 if cards_to_discard:
                     for card_idx in sorted(cards_to_discard, reverse=True):
                         self.fold_card(card_idx)
-                    self.game.add_history(f"{self.mr_card.name} 发动[集智]，弃置了2张牌")
+                    self.game.log_event(EventKind.SKILL, self, "{actor} 发动[集智]，弃置了2张牌")
                     
                     # 更新玩家信息显示
                     if self.game.gui.player_widgets.get(self.position):
@@ -1281,10 +1337,10 @@ class HumanPlayer(Player):
                         self.fold_card(idx)
                     
                     # 添加历史记录（跳牌本身不计入弃置牌数）
-                    self.game.add_history(f"{self.mr_card.name} 发动[旋风]，弃置了 {len(same_value_cards)} 张相同点数的牌")
+                    self.game.log_event(EventKind.SKILL, self, "{actor} 发动[旋风]，弃置了 {} 张相同点数的牌", len(same_value_cards))
                 else:
                     # 没有相同点数的牌，但仍然记录发动技能
-                    self.game.add_history(f"{self.mr_card.name} 发动[旋风]，没有相同点数的牌可弃置")
+                    self.game.log_event(EventKind.SKILL, self, "{actor} 发动[旋风]，没有相同点数的牌可弃置")
                 
                 # 技能执行完成后，手动结束回合
                 self.game.turn_action_taken = True
@@ -1296,7 +1352,7 @@ class HumanPlayer(Player):
             if target:
                 # 让目标玩家摸2张牌
                 target.draw_cards(2, is_skill_draw=True)
-                self.game.add_history(f"{self.mr_card.name} 发动[散谣]，令 {target.mr_card.name} 摸了2张牌")
+                self.game.log_event(EventKind.SKILL, self, "{actor} 发动[散谣]，令 {} 摸了2张牌", target.mr_card.name)
                 
                 # 技能执行完成后，手动结束回合
                 self.game.turn_action_taken = True
@@ -1427,7 +1483,7 @@ class AIPlayer(Player):
         message = f"AI 玩家 {self.position+1} ({self.mr_card.name}) 发动【奸雄】，获得了以下牌: {', '.join(str(c) for c in cards_to_gain)}"
         print(message)
         # 添加历史记录
-        self.game.add_history(f"{self.mr_card.name} 发动[奸雄]，获得了 {len(cards_to_gain)} 张牌")
+        self.game.log_event(EventKind.SKILL, self, "{actor} 发动[奸雄]，获得了 {} 张牌", len(cards_to_gain))
 
         # 获得牌后，检查手牌上限
         self.check_hand_limit_and_discard_if_needed()
@@ -1437,17 +1493,16 @@ class AIPlayer(Player):
 
     def execute_skill_wusheng(self, card_idx):
         """AI玩家武圣技能处理"""
-        from card import UnoCard
         original_card = self.uno_list.pop(card_idx)
         # 更新uno状态
         self.update_uno_state()
-        wusheng_card = UnoCard('draw2', 'red', 0)
-        self.game.playedcards.add_card(wusheng_card, self, original_card)
+        wusheng_card = WUSHENG_CARD
+        self.game.playedcards.add_card(wusheng_card, self, original_card, turn=self.game.turn_count)
         self.game.cur_color = 'red'
         self.game.change_flag() # 触发+2效果
         print(f"AI 玩家 {self.position+1} ({self.mr_card.name}) 发动【武圣】，将 {original_card} 当作 {wusheng_card} 打出")
         # 添加历史记录
-        self.game.add_history(f"{self.mr_card.name} 发动[武圣]，将 [{original_card}] 当作 [红+2] 打出")
+        self.game.log_event(EventKind.SKILL, self, "{actor} 发动[武圣]，将 [{}] 当作 [红+2] 打出", original_card)
 
     def execute_skill(self, skill, *args):
         """AI玩家技能执行"""
@@ -1471,11 +1526,11 @@ class AIPlayer(Player):
             discarded_count = len(cards_to_discard)
             if discarded_count > 2:
                 self.draw_cards(1, is_skill_draw=True)
-                self.game.add_history(f"{self.mr_card.name} 弃牌数量为{discarded_count}，额外摸了一张牌")
+                self.game.log_event(EventKind.SKILL, self, "{actor} 弃牌数量为{}，额外摸了一张牌", discarded_count)
 
             print(f"AI反间成功，玩家 {target.position+1} 弃掉了所有 {color_to_discard} 牌。")
             # 添加历史记录
-            self.game.add_history(f"{self.mr_card.name} 发动[反间]，玩家 {target.position+1} 弃掉了所有 {color_to_discard} 牌")
+            self.game.log_event(EventKind.SKILL, self, "{actor} 发动[反间]，玩家 {} 弃掉了所有 {} 牌", target.position+1, color_to_discard)
 
         # 检查胜利条件
         if self.game.check_win_condition(self) or self.game.check_win_condition(target):
@@ -1512,7 +1567,7 @@ class AIPlayer(Player):
         self.draw_cards(1, is_skill_draw=True)
         print(f"AI 玩家 {self.position+1} ({self.mr_card.name}) 发动【{skill_name}】，摸了1张牌")
         # 添加历史记录
-        self.game.add_history(f"{self.mr_card.name} 发动[{skill_name}]，摸了1张牌")
+        self.game.log_event(EventKind.SKILL, self, "{actor} 发动[{}]，摸了1张牌", skill_name)
         # 技能执行完成后，手动结束回合
         self.game.turn_action_taken = True
 
@@ -1541,10 +1596,10 @@ class AIPlayer(Player):
                         self.fold_card(idx)
                     
                     # 添加历史记录（跳牌本身不计入弃置牌数）
-                    self.game.add_history(f"{self.mr_card.name} 发动[旋风]，弃置了 {len(same_value_cards)} 张相同点数的牌")
+                    self.game.log_event(EventKind.SKILL, self, "{actor} 发动[旋风]，弃置了 {} 张相同点数的牌", len(same_value_cards))
                 else:
                     # 没有相同点数的牌，但仍然记录发动技能
-                    self.game.add_history(f"{self.mr_card.name} 发动[旋风]，没有相同点数的牌可弃置")
+                    self.game.log_event(EventKind.SKILL, self, "{actor} 发动[旋风]，没有相同点数的牌可弃置")
                 
                 # 技能执行完成后，手动结束回合
                 self.game.turn_action_taken = True
@@ -1591,16 +1646,30 @@ class AIPlayer(Player):
         - action_value: 如果是play，则为卡牌索引；如果是draw，则为None
         """
         # 使用AI处理器获取决策
+        view, game_state = self.decision_snapshot()
+        action_type, action_value = self.game.ai_handler.choose_action(view, game_state)
+        print(f"AI ({self.mr_card.name}) 决定: {action_type} {action_value if action_value is not None else ''}")
+        return action_type, action_value
+
+    def decision_snapshot(self):
+        """拍下决策所需的局面快照：(本玩家的 PlayerView, game_state)。
+        快照不引用会继续变化的手牌与 Game 状态，可以交给工作线程决策。"""
+        players = []
+        view = None
+        for p in self.game.player_list:
+            if p is self:
+                view = PlayerView(self.position, self.team, self.mr_card, tuple(self.uno_list), self.playable_mask())
+                players.append(view)
+            else:
+                players.append(PlayerView(p.position, p.team, p.mr_card, tuple(p.uno_list)))
         game_state = {
-            'players': self.game.player_list,
+            'players': players,
             'last_card': self.game.playedcards.get_one(),
             'current_color': self.game.cur_color,
             'draw_n': self.game.draw_n,
             'game_direction': self.game.dir,
         }
-        action_type, action_value = self.game.ai_handler.choose_action(self, game_state)
-        print(f"AI ({self.mr_card.name}) 决定: {action_type} {action_value if action_value is not None else ''}")
-        return action_type, action_value
+        return view, game_state
 
     def _execute_player_decision(self, action_type, action_value):
         """
@@ -0,0 +1,38 @@
+"""+牌串的增量归因与逐项遍历的结果一致"""
+import os
+import sys
+import random
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from card import deck_card
+from util import DrawChain
+
+
+def reference_allocation(chain, drawn):
+    """按牌串顺序逐项扣减"""
+    result = Counter()
+    remaining = drawn
+    for effective_card, _, source in chain:
+        amount = 2 if effective_card.type == 'draw2' else 4 if effective_card.type == 'wild_draw4' else 0
+        if not source or not amount or remaining <= 0:
+            continue
+        alloc = min(amount, remaining)
+        result[source] += alloc
+        remaining -= alloc
+    return result
+
+
+def test_allocation_matches_chain_order():
+    rng = random.Random(0)
+    cards = [deck_card('draw2', 'red', 0), deck_card('wild_draw4', 'wild_draw4', 10)]
+    sources = ['A', 'B', 'C', None]
+    chain = DrawChain()
+    for _ in range(5000):
+        if rng.random() < 0.3:
+            chain.clear()
+        card = rng.choice(cards)
+        chain.append((card, card, rng.choice(sources)))
+        drawn = rng.randint(0, chain.total + 2)
+        assert Counter(dict(chain.allocate(drawn))) == reference_allocation(chain, drawn)
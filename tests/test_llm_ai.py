@@ -0,0 +1,103 @@
+"""LLM 电脑玩家：回复解析与无法解析时退回规则AI（不发网络请求）"""
+import os
+import sys
+import contextlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ai import DeepSeekAI, parse_action
+from decision_cache import DecisionCache
+from game import Game
+
+
+class FakeClient:
+    """代替 LLMClient：不发请求，按流式接口的约定把固定回复交给 parse"""
+
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = 0
+
+    def chat_stream(self, messages, parse, **params):
+        self.calls += 1
+        return parse(self.answer, True)
+
+    def chat(self, messages, **params):
+        self.calls += 1
+        return self.answer
+
+
+@contextlib.contextmanager
+def quiet():
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def make_ai(monkeypatch, answer):
+    # load_config 从启动脚本所在目录读取 config.json
+    monkeypatch.setattr(sys, 'argv', [os.path.join(ROOT, 'run_trino.py')])
+    llm_ai = DeepSeekAI(api_url='http://127.0.0.1:9/v1/chat/completions')
+    llm_ai.client = FakeClient(answer)
+    llm_ai.cache = DecisionCache()
+    return llm_ai
+
+
+def snapshot(seed=3):
+    game = Game(player_num=3, seed=seed)
+    with quiet():
+        game.game_start(None, ['甘宁', '刘表', '马谡'])
+    return game.player_list[0].decision_snapshot()
+
+
+def test_parse_action():
+    assert parse_action('play 3') == ('play', 3)
+    assert parse_action(' "draw".') == ('draw', None)
+    assert parse_action('play 1', final=False) is None  # 数字可能还没收完
+    assert parse_action('play 12 因为', final=False) == ('play', 12)
+    assert parse_action('抱歉，我无法决定') is None
+    assert parse_action('pass 2') is None
+    assert parse_action('play') is None
+
+
+def test_unparseable_reply_falls_back_to_rules(monkeypatch):
+    llm_ai = make_ai(monkeypatch, '抱歉 1')
+    view, game_state = snapshot()
+    with quiet():
+        action = llm_ai.choose_action(view, game_state)
+        expected = llm_ai.fallback.rule_based_choice(view, game_state)
+    assert action == expected
+    assert action[0] in ('play', 'draw')
+
+
+def test_invalid_actions_are_not_cached(monkeypatch):
+    view, game_state = snapshot()
+    cache = DecisionCache()
+    cache.store(view, game_state, '抱歉', None)
+    cache.store(view, game_state, 'play', None)
+    cache.store(view, game_state, 'draw', 0)
+    assert len(cache) == 0
+    assert cache.lookup(view, game_state) is None
+
+    llm_ai = make_ai(monkeypatch, '抱歉')
+    with quiet():
+        llm_ai.choose_action(view, game_state)
+        llm_ai.choose_action(view, game_state)
+    # 无法解析的回复不缓存，同一局面再次决策仍会请求接口
+    assert len(llm_ai.cache) == 0
+    assert llm_ai.client.calls == 2
+
+
+def test_valid_action_is_cached(monkeypatch):
+    llm_ai = make_ai(monkeypatch, 'draw')
+    view, game_state = snapshot()
+    with quiet():
+        assert llm_ai.choose_action(view, game_state) == ('draw', None)
+        assert llm_ai.choose_action(view, game_state) == ('draw', None)
+    assert llm_ai.client.calls == 1
+
+
+def test_invalid_entries_on_disk_are_dropped(tmp_path):
+    path = tmp_path / 'cache.json'
+    path.write_text('{"a": ["抱歉", null, 0], "b": ["draw", null, 0], "c": ["play", 5, 0]}', encoding='utf-8')
+    cache = DecisionCache(path=str(path))
+    assert len(cache) == 2
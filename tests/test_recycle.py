@@ -0,0 +1,56 @@
+"""弃牌堆重洗：任何时刻 手牌 + 摸牌堆 + 弃牌堆（环形缓冲与 buried） 恰好是一整副牌"""
+import os
+import sys
+import contextlib
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from card import DECK_SIZE
+from game import Game
+
+
+def card_ids(game):
+    ids = Counter()
+    for player in game.player_list:
+        ids.update(card.id for card in player.uno_list)
+    ids.update(game.unocard_pack)
+    ids.update(game.playedcards.buried)
+    ids.update(orig.id for _, orig, _ in game.playedcards.d if orig.id is not None and orig.id < DECK_SIZE)
+    return ids
+
+
+@contextlib.contextmanager
+def quiet():
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def new_game(seed=1):
+    game = Game(player_num=3, seed=seed)
+    with quiet():
+        game.game_start(None, ['甘宁', '刘表', '马谡'])
+    return game
+
+
+def test_folded_cards_are_recycled():
+    full_deck = Counter(range(DECK_SIZE))
+    game = new_game()
+    assert card_ids(game) == full_deck
+    with quiet():
+        for player in game.player_list:
+            player.fold_card([0, 1])
+            player.fold_card_objects([player.uno_list[0]])
+            assert card_ids(game) == full_deck
+            card = player.play_a_hand(0)
+            game.playedcards.add_card(card, player, turn=game.turn_count)
+            assert card_ids(game) == full_deck
+
+        drawer = game.player_list[0]
+        # 摸空牌堆后继续摸，触发重洗
+        drawer.draw_cards(len(game.unocard_pack) + 3)
+    assert card_ids(game) == full_deck
+    # 弃置的9张与被顶牌压下的出牌都已洗回（摸走3张后仍在牌堆中）
+    assert len(game.unocard_pack) > 0
+    assert len(game.playedcards.buried) == 0
+    assert len(game.playedcards.d) == 1
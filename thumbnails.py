@@ -0,0 +1,190 @@
+"""武将立绘缩略图缓存。
+
+按源文件内容的 SHA-1 在磁盘上缓存每张立绘的多档缩略图（各界面的基准尺寸 × 窗口缩放档位），
+运行时只读取几十KB的缩略图，不再解码原始大图。源文件改动后哈希变化，自动重新生成。
+只使用 QImage，可以在工作线程中调用。
+
+首次运行游戏时按需生成；也可以提前为全部武将生成：
+    python thumbnails.py
+"""
+import os
+import sys
+import json
+import atexit
+import hashlib
+import threading
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+# 各界面使用的立绘基准尺寸：本人信息栏、其他玩家信息栏、武将图鉴、选将对话框
+BASE_SIZES = ((220, 280), (180, 220), (180, 252), (300, 339))
+# MainWindow.calculate_scale_factor 的取值范围为 0.5~2.0，按 0.25 分档
+SCALE_STEPS = (0.5, 0.75, 1.0, 1.25, 1.5, 1.75, 2.0)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'trino', 'thumbnails')
+INDEX_FILE = 'index.json'
+INDEX_SAVE_EVERY = 16  # 每新增多少条哈希记录写一次索引（退出时也会写）
+
+
+def thumbnail_sizes():
+    """全部缩略图档位，按面积从小到大排列"""
+    sizes = {(int(w * scale), int(h * scale)) for w, h in BASE_SIZES for scale in SCALE_STEPS}
+    return sorted(sizes, key=lambda size: (size[0] * size[1], size))
+
+
+class ThumbnailCache:
+    """磁盘缩略图缓存：文件名为 <源文件sha1>_<宽>x<高>.png"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.sizes = thumbnail_sizes()
+        self._lock = threading.Lock()
+        self._index = None  # 源文件绝对路径 -> [文件大小, mtime_ns, sha1]
+        self._index_unsaved = 0
+        atexit.register(self.flush)
+
+    # ---------- 源文件哈希 ----------
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(os.path.join(self.cache_dir, INDEX_FILE), encoding='utf-8') as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self):
+        """原子地写出索引（调用方持有 self._lock）"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = os.path.join(self.cache_dir, INDEX_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(self.cache_dir, INDEX_FILE))
+        self._index_unsaved = 0
+
+    def flush(self):
+        """把尚未写出的哈希记录写入索引"""
+        with self._lock:
+            if self._index_unsaved:
+                try:
+                    self._save_index()
+                except OSError:
+                    pass
+
+    def source_hash(self, path: str) -> str:
+        """源文件的 sha1；文件大小与修改时间未变时直接取索引中的记录，不重新读文件"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._load_index().get(path)
+            if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                return entry[2]
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        sha1 = digest.hexdigest()
+        with self._lock:
+            self._load_index()[path] = [stat.st_size, stat.st_mtime_ns, sha1]
+            self._index_unsaved += 1
+            if self._index_unsaved >= INDEX_SAVE_EVERY:
+                try:
+                    self._save_index()
+                except OSError:
+                    pass
+        return sha1
+
+    # ---------- 缩略图 ----------
+    def _thumbnail_path(self, sha1, size):
+        return os.path.join(self.cache_dir, f'{sha1}_{size[0]}x{size[1]}.png')
+
+    def _save_thumbnail(self, thumb, sha1, size):
+        """先写临时文件再改名：并发生成同一张缩略图时互不干扰，读取方也不会读到写了一半的文件"""
+        path = self._thumbnail_path(sha1, size)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        if thumb.save(tmp_path, 'PNG'):
+            try:
+                os.replace(tmp_path, path)
+            except OSError:
+                pass
+
+    def pick_size(self, width: int, height: int):
+        """能完整容纳 width×height 的最小档位；超出全部档位时取最大档"""
+        for size in self.sizes:
+            if size[0] >= width and size[1] >= height:
+                return size
+        return self.sizes[-1]
+
+    def generate(self, path: str, sha1: str = None) -> dict:
+        """解码一次原图，生成并保存全部档位，返回 {档位: QImage}"""
+        sha1 = sha1 or self.source_hash(path)
+        source = QImage(path)
+        if source.isNull():
+            return {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        thumbs = {}
+        for size in self.sizes:
+            thumb = source.scaled(size[0], size[1], Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            self._save_thumbnail(thumb, sha1, size)
+            thumbs[size] = thumb
+        return thumbs
+
+    def known_hash(self, path: str):
+        """索引中记录的 sha1（文件大小与修改时间未变时）；没有记录时返回 None，不读源文件"""
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._load_index().get(path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+        return None
+
+    def image(self, path: str, width: int, height: int, generate: bool = True) -> QImage:
+        """返回等比缩放到 width×height 以内的立绘，优先使用磁盘缩略图。
+        缩略图不存在时，generate 为 True 则解码原图一次生成全部档位；
+        为 False 时（GUI线程）不读取源文件，直接返回空 QImage，由调用方交给工作线程生成"""
+        if generate:
+            try:
+                sha1 = self.source_hash(path)
+            except OSError:
+                return QImage()
+        else:
+            sha1 = self.known_hash(path)
+            if sha1 is None:
+                return QImage()
+        size = self.pick_size(width, height)
+        thumb = QImage(self._thumbnail_path(sha1, size))
+        if thumb.isNull():
+            if not generate:
+                return thumb
+            thumb = self.generate(path, sha1).get(size, QImage())
+            if thumb.isNull():
+                return thumb
+        if thumb.width() > width or thumb.height() > height:
+            # 从小尺寸缩略图缩放，代价可以忽略
+            thumb = thumb.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        return thumb
+
+
+def main(argv=None):
+    """为全部武将预生成缩略图"""
+    from mr_cards import all_heroes
+    from gui import get_hero_image_path
+
+    cache = ThumbnailCache(argv[0] if argv else DEFAULT_CACHE_DIR)
+    count = 0
+    for hero_card in all_heroes.values():
+        path = get_hero_image_path(hero_card)
+        if path and cache.generate(path):
+            count += 1
+    cache.flush()
+    print(f"已为 {count} 名武将生成缩略图（{len(cache.sizes)} 档），缓存目录: {cache.cache_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,240 @@
+"""trino-sim：多进程AI自对弈模拟器，用于统计武将之间的胜率矩阵。
+
+用法示例：
+    python trino_sim.py --games 100000 --players 3 --workers 32
+    python trino_sim.py --replay 123456789   # 按种子完整重放单局（保留对局输出）
+    python trino_sim.py --games 20 --workers 1 --llm-url http://127.0.0.1:8765/v1/chat/completions
+                                              # 电脑玩家改用LLM决策（可配合 llm_stub.py），并统计每步请求延迟
+"""
+import os
+import sys
+import json
+import argparse
+import contextlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from game import Game
+from ai import AI
+from mr_cards import all_heroes
+
+STAT_KEYS = ('played_cards', 'drawn_cards', 'skills_used', 'caused_neighbor_draws')
+# 默认每个工作进程分到约 TASKS_PER_WORKER 个批次，单批最多 MAX_CHUNK_SIZE 局：
+# 批次足够多才能让所有核心都有活干，并在各批耗时不均时均衡负载
+TASKS_PER_WORKER = 4
+MAX_CHUNK_SIZE = 2000
+
+
+def _new_result():
+    """单个工作进程的汇总结果（全部为可pickle的普通dict）"""
+    return {
+        'games': 0,
+        'unfinished': 0,
+        'hero_games': defaultdict(int),
+        'hero_wins': defaultdict(float),
+        'hero_stats': defaultdict(lambda: dict.fromkeys(STAT_KEYS, 0)),
+        # pair_games[a][b]: a 与 b 同场的局数；pair_wins[a][b]: 其中 a 获胜的局数
+        'pair_games': defaultdict(lambda: defaultdict(int)),
+        'pair_wins': defaultdict(lambda: defaultdict(float)),
+    }
+
+
+def _to_plain(result):
+    """将 defaultdict 转为普通 dict，便于跨进程传输与合并"""
+    return {
+        'games': result['games'],
+        'unfinished': result['unfinished'],
+        'hero_games': dict(result['hero_games']),
+        'hero_wins': dict(result['hero_wins']),
+        'hero_stats': {k: dict(v) for k, v in result['hero_stats'].items()},
+        'pair_games': {k: dict(v) for k, v in result['pair_games'].items()},
+        'pair_wins': {k: dict(v) for k, v in result['pair_wins'].items()},
+    }
+
+
+def game_seed(base_seed, index):
+    """由基础种子与全局局序号派生单局种子，与分片方式无关"""
+    return ((base_seed & 0xFFFFFFFF) << 32) | (index & 0xFFFFFFFF)
+
+
+def play_one_game(seed, num_players, heroes, result=None, history_path=None, llm_url=None):
+    """无GUI模式下跑完一局（选将也由本局种子决定），并把结果累加到 result 中"""
+    game = Game(player_num=num_players, seed=seed, history_path=history_path)
+    if llm_url:
+        game.ai_handler = AI(ai_level='llm_based', api_url=llm_url)
+    game.game_start(None, game.rng.sample(heroes, num_players))
+    winners = game.run_to_completion()
+    if result is None:
+        return game
+
+    result['games'] += 1
+    if not game.game_over:
+        result['unfinished'] += 1
+    # 平局时胜场平分
+    share = 1.0 / len(winners) if winners else 0.0
+    winner_names = {p.mr_card.name for p in winners}
+
+    for player in game.player_list:
+        name = player.mr_card.name
+        result['hero_games'][name] += 1
+        if name in winner_names:
+            result['hero_wins'][name] += share
+        player_stats = game.stats.get(player)
+        if player_stats:
+            hero_stats = result['hero_stats'][name]
+            for key in STAT_KEYS:
+                hero_stats[key] += player_stats.get(key, 0)
+        for other in game.player_list:
+            if other is player:
+                continue
+            other_name = other.mr_card.name
+            result['pair_games'][name][other_name] += 1
+            if name in winner_names:
+                result['pair_wins'][name][other_name] += share
+    return game
+
+
+def run_chunk(start_index, num_games, num_players, heroes, seed, llm_url=None):
+    """工作进程入口：跑序号为 [start_index, start_index+num_games) 的对局，只在结束时返回一次汇总结果"""
+    result = _new_result()
+    # LLM客户端在进程内共享，同一进程可能先后跑多批：开始前清零，只返回本批的统计
+    llm_ai = AI(ai_level='llm_based', api_url=llm_url).llm_ai if llm_url else None
+    if llm_ai:
+        llm_ai.client.stats.reset()
+        llm_ai.cache.reset_stats()
+    # 游戏内部大量 print，批量模拟时全部丢弃
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        for index in range(start_index, start_index + num_games):
+            play_one_game(game_seed(seed, index), num_players, heroes, result, llm_url=llm_url)
+    plain = _to_plain(result)
+    if llm_ai:
+        plain['llm'] = {**llm_ai.client.stats.to_dict(), **llm_ai.cache.stats()}
+    return plain
+
+
+def merge_results(results):
+    """合并多个工作进程返回的结果"""
+    merged = _new_result()
+    llm = None
+    for result in results:
+        if 'llm' in result:
+            if llm is None:
+                llm = dict.fromkeys(result['llm'], 0)
+            for key, value in result['llm'].items():
+                llm[key] = max(llm[key], value) if key == 'max_seconds' else llm[key] + value
+        merged['games'] += result['games']
+        merged['unfinished'] += result['unfinished']
+        for name, count in result['hero_games'].items():
+            merged['hero_games'][name] += count
+        for name, wins in result['hero_wins'].items():
+            merged['hero_wins'][name] += wins
+        for name, stats in result['hero_stats'].items():
+            for key, value in stats.items():
+                merged['hero_stats'][name][key] += value
+        for name, row in result['pair_games'].items():
+            for other_name, count in row.items():
+                merged['pair_games'][name][other_name] += count
+        for name, row in result['pair_wins'].items():
+            for other_name, wins in row.items():
+                merged['pair_wins'][name][other_name] += wins
+    plain = _to_plain(merged)
+    if llm is not None:
+        plain['llm'] = llm
+    return plain
+
+
+def win_rate_matrix(merged):
+    """返回 {hero: {opponent: 同场时 hero 的胜率}}"""
+    matrix = {}
+    for name, row in merged['pair_games'].items():
+        wins_row = merged['pair_wins'].get(name, {})
+        matrix[name] = {other: wins_row.get(other, 0.0) / count for other, count in row.items() if count}
+    return matrix
+
+
+def default_chunk_size(total_games, workers):
+    """未指定批次大小时，按 ceil(总局数 / (进程数 * TASKS_PER_WORKER)) 切分，上限 MAX_CHUNK_SIZE"""
+    return max(1, min(MAX_CHUNK_SIZE, -(-total_games // (workers * TASKS_PER_WORKER))))
+
+
+def run_tournament(total_games, num_players=3, workers=None, chunk_size=None, seed=0, heroes=None, llm_url=None):
+    """将 total_games 局拆分为若干批次，分发到进程池执行并合并结果（各局种子只取决于序号，结果与批次划分无关）"""
+    heroes = list(heroes or all_heroes.keys())
+    if num_players > len(heroes):
+        raise ValueError(f"玩家数({num_players})不能超过可选武将数({len(heroes)})")
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or default_chunk_size(total_games, workers)
+    chunks = [(start, min(chunk_size, total_games - start)) for start in range(0, total_games, chunk_size)]
+
+    if workers == 1:
+        results = [run_chunk(start, size, num_players, heroes, seed, llm_url) for start, size in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_chunk, start, size, num_players, heroes, seed, llm_url)
+                       for start, size in chunks]
+            results = [f.result() for f in futures]
+    return merge_results(results)
+
+
+def print_report(merged):
+    """打印每个武将的胜率与统计，以及武将对位胜率矩阵"""
+    print(f"总局数: {merged['games']}  未正常结束: {merged['unfinished']}")
+    names = sorted(merged['hero_games'], key=lambda n: -merged['hero_wins'].get(n, 0) / merged['hero_games'][n])
+    print(f"{'武将':<6}{'局数':>8}{'胜率':>8}" + ''.join(f"{k:>24}" for k in STAT_KEYS))
+    for name in names:
+        games = merged['hero_games'][name]
+        stats = merged['hero_stats'].get(name, {})
+        line = f"{name:<6}{games:>8}{merged['hero_wins'].get(name, 0) / games:>8.3f}"
+        line += ''.join(f"{stats.get(k, 0) / games:>24.2f}" for k in STAT_KEYS)
+        print(line)
+
+    matrix = win_rate_matrix(merged)
+    print("\n对位胜率矩阵（行武将与列武将同场时，行武将的胜率）")
+    print(f"{'':<6}" + ''.join(f"{n:>8}" for n in names))
+    for name in names:
+        row = matrix.get(name, {})
+        print(f"{name:<6}" + ''.join(f"{row[o]:>8.3f}" if o in row else f"{'-':>8}" for o in names))
+
+    llm = merged.get('llm')
+    if llm:
+        average_ms = llm['total_seconds'] / llm['calls'] * 1000 if llm['calls'] else 0.0
+        tokens_per_move = llm.get('prompt_tokens', 0) / llm['calls'] if llm['calls'] else 0.0
+        print(f"\nLLM请求: {llm['calls']} 次  平均 {average_ms:.1f} ms  最长 {llm['max_seconds'] * 1000:.1f} ms  "
+              f"失败 {llm['failures']} 次  熔断跳过 {llm['rejected']} 次  提前结束流式回复 {llm.get('early_stops', 0)} 次  "
+              f"缓存命中 {llm.get('cache_hits', 0)} / {llm.get('cache_hits', 0) + llm.get('cache_misses', 0)}  "
+              f"每步提示词约 {tokens_per_move:.0f} tokens")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='trino-sim', description='Trino AI自对弈批量模拟')
+    parser.add_argument('--games', type=int, default=10000, help='模拟总局数')
+    parser.add_argument('--players', type=int, default=3, help='每局玩家数')
+    parser.add_argument('--workers', type=int, default=None, help='工作进程数，默认使用全部CPU核心')
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help=f'每个任务批次的局数，默认按进程数切分为约 {TASKS_PER_WORKER} 倍进程数的批次（每批最多 {MAX_CHUNK_SIZE} 局）')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--heroes', nargs='*', default=None, help='参与模拟的武将，默认全部')
+    parser.add_argument('--json', dest='json_path', default=None, help='将结果写入JSON文件')
+    parser.add_argument('--replay', type=int, default=None, metavar='GAME_SEED', help='按单局种子重放一局并输出完整过程')
+    parser.add_argument('--history', dest='history_path', default=None, help='重放时将完整事件历史追加写入该JSON Lines文件')
+    parser.add_argument('--llm-url', default=None, help='电脑玩家改用该地址的LLM接口决策（例如 llm_stub.py），并统计请求延迟')
+    args = parser.parse_args(argv)
+
+    if args.replay is not None:
+        game = play_one_game(args.replay, args.players, list(args.heroes or all_heroes.keys()),
+                             history_path=args.history_path)
+        print(f"获胜: {[p.mr_card.name for p in game.winners]}  回合数: {game.turn_count}")
+        return 0
+
+    merged = run_tournament(args.games, args.players, args.workers, args.chunk_size, args.seed, args.heroes,
+                            args.llm_url)
+    print_report(merged)
+    if args.json_path:
+        merged['win_rate_matrix'] = win_rate_matrix(merged)
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
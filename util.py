@@ -1,6 +1,10 @@
 from __future__ import annotations
-from card import UnoCard
+from card import UnoCard, CARDS, DECK_SIZE
+from array import array
+from bisect import bisect_right
 from collections import deque
+from itertools import islice
+from functools import lru_cache
 from dataclasses import dataclass
 from typing import Optional, TYPE_CHECKING
 
@@ -9,21 +13,305 @@ if TYPE_CHECKING:
 
 #本文件将编写一些可能用到的数据结构
 
+class Hand(list):
+    """手牌列表：在普通 list 的基础上增量维护一个以卡牌id为位的位图(mask)。
+
+    位图的第 i 位为1表示手牌中至少有一张 id 为 i 的牌，
+    与 legal_play_mask 做一次按位与即可得到全部可出的牌。
+    同时按牌面计数，某个牌面从无到有/从有到无时通知 owner（用于跳牌索引）。
+    """
+    def __init__(self, cards=(), owner=None):
+        super().__init__()
+        self.mask = 0
+        self._counts = bytearray(len(CARDS))
+        self._face_counts = {}
+        self.owner = owner
+        self.extend(cards)
+
+    def has_face(self, face) -> bool:
+        """手牌中是否有该牌面的牌"""
+        return face in self._face_counts
+
+    def faces(self):
+        """手牌中出现的全部牌面id"""
+        return self._face_counts.keys()
+
+    def _track(self, card):
+        cid = card.id
+        if cid is not None:
+            if not self._counts[cid]:
+                self.mask |= 1 << cid
+            self._counts[cid] += 1
+        face = card.face
+        count = self._face_counts.get(face, 0)
+        self._face_counts[face] = count + 1
+        if not count and self.owner is not None:
+            self.owner._on_face_added(face)
+
+    def _untrack(self, card):
+        cid = card.id
+        if cid is not None:
+            self._counts[cid] -= 1
+            if not self._counts[cid]:
+                self.mask &= ~(1 << cid)
+        face = card.face
+        count = self._face_counts[face] - 1
+        if count:
+            self._face_counts[face] = count
+        else:
+            del self._face_counts[face]
+            if self.owner is not None:
+                self.owner._on_face_removed(face)
+
+    def _rebuild(self):
+        old_faces = set(self._face_counts)
+        owner, self.owner = self.owner, None
+        self.mask = 0
+        self._counts = bytearray(len(CARDS))
+        self._face_counts = {}
+        for card in self:
+            self._track(card)
+        self.owner = owner
+        if owner is not None:
+            new_faces = set(self._face_counts)
+            for face in old_faces - new_faces:
+                owner._on_face_removed(face)
+            for face in new_faces - old_faces:
+                owner._on_face_added(face)
+
+    def append(self, card):
+        super().append(card)
+        self._track(card)
+
+    def extend(self, cards):
+        for card in cards:
+            self.append(card)
+
+    def __iadd__(self, cards):
+        self.extend(cards)
+        return self
+
+    def insert(self, index, card):
+        super().insert(index, card)
+        self._track(card)
+
+    def pop(self, index=-1):
+        card = super().pop(index)
+        self._untrack(card)
+        return card
+
+    def remove(self, card):
+        super().remove(card)
+        self._untrack(card)
+
+    def clear(self):
+        super().clear()
+        self._rebuild()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._rebuild()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._rebuild()
+
+    def copy(self):
+        return list(self)
+
+    def __reduce__(self):
+        return (Hand, (list(self),))
+
+def is_legal_play(card: UnoCard, last_card: Optional[UnoCard], cur_color: str,
+                  stack_type: Optional[str] = None, qingguo: bool = False, longdan: bool = False) -> bool:
+    """出牌规则判定（与 Player.check_card 的规则一致）。
+    :param stack_type: 存在待结算的+牌串时为上一张牌的类型（'draw2'/'wild_draw4'），否则为None
+    :param qingguo: 是否拥有【倾国】
+    :param longdan: 是否拥有【龙胆】
+    """
+    # +2上只能叠+2或+4，+4上只能叠+4
+    if stack_type == 'draw2' and card.type not in ['draw2', 'wild_draw4']:
+        return False
+    if stack_type == 'wild_draw4' and card.type != 'wild_draw4':
+        return False
+    # 倾国：蓝色牌可以当任何颜色出
+    if qingguo and card.color == 'blue':
+        return True
+    # 龙胆：红蓝互换
+    if longdan:
+        if card.color == 'red' and cur_color == 'blue':
+            return True
+        if card.color == 'blue' and cur_color == 'red':
+            return True
+    if card.type == 'wild' or card.type == 'wild_draw4':
+        return True
+    if card.color == cur_color:
+        return True
+    if last_card and card.type == last_card.type and card.type != 'number':
+        return True
+    if last_card and card.type == 'number' and last_card.type == 'number' and card.value == last_card.value:
+        return True
+    return False
+
+# 牌面id -> 该牌面的一张代表牌
+_FACE_CARDS = {}
+for _card in CARDS:
+    _FACE_CARDS.setdefault(_card.face, _card)
+
+@lru_cache(maxsize=None)
+def _legal_mask_for_face(last_face: Optional[int], cur_color: str, stack_type: Optional[str], qingguo: bool, longdan: bool) -> int:
+    return _compute_legal_mask(_FACE_CARDS.get(last_face), cur_color, stack_type, qingguo, longdan)
+
+def _compute_legal_mask(last_card, cur_color, stack_type, qingguo, longdan) -> int:
+    mask = 0
+    for card in CARDS:
+        if is_legal_play(card, last_card, cur_color, stack_type, qingguo, longdan):
+            mask |= 1 << card.id
+    return mask
+
+def legal_play_mask(last_card: Optional[UnoCard], cur_color: str, stack_type: Optional[str] = None,
+                    qingguo: bool = False, longdan: bool = False) -> int:
+    """返回所有可出的卡牌id位图。同一 (牌面, 颜色, +牌串状态, 武将规则) 只计算一次。"""
+    if last_card is None:
+        return _legal_mask_for_face(None, cur_color, stack_type, qingguo, longdan)
+    if last_card.face not in _FACE_CARDS:
+        # 牌组之外的牌面，不缓存
+        return _compute_legal_mask(last_card, cur_color, stack_type, qingguo, longdan)
+    return _legal_mask_for_face(last_card.face, cur_color, stack_type, qingguo, longdan)
+
+@dataclass
+class CardProvenance:
+    """一张已打出的牌的来源记录"""
+    source: Optional[Player]
+    turn: int
+    effective_card: UnoCard
+    original_card: UnoCard
+
+@dataclass(frozen=True)
+class PlayerView:
+    """玩家在某一时刻的只读快照，AI 可以在工作线程中基于它决策，不读取仍在变化的 Game 状态"""
+    position: int
+    team: Optional[str]
+    mr_card: object
+    uno_list: tuple
+    legal_mask: int = 0
+
+    def playable_mask(self) -> int:
+        return self.legal_mask
+
+class DrawChain(list):
+    """+牌串，元素为 (effective_card, original_card, source_player)。
+
+    追加时增量维护总摸牌数 total 与各来源玩家的累计贡献 tallies，归因时只需遍历来源玩家。
+    摸牌数不足（牌堆耗尽）时仍按牌串顺序分摊：每个来源额外记录其各项贡献在牌串中的结束位置
+    与前缀和，二分查找即可得到截断点之前的贡献。
+    """
+    def __init__(self, entries=()):
+        super().__init__()
+        self.total = 0
+        self.contributed = 0  # 有来源的+2/+4贡献之和
+        self.tallies: dict[Player, int] = {}
+        # 来源玩家 -> (各项贡献在牌串中的结束位置, 该来源贡献的前缀和)
+        self._spans: dict[Player, tuple[list[int], list[int]]] = {}
+        self.extend(entries)
+
+    def append(self, entry):
+        super().append(entry)
+        effective_card, _, source_player = entry
+        self.total += 2 if effective_card.type == 'draw2' else 4
+        amount = 2 if effective_card.type == 'draw2' else 4 if effective_card.type == 'wild_draw4' else 0
+        if source_player and amount:
+            self.contributed += amount
+            tally = self.tallies.get(source_player, 0) + amount
+            self.tallies[source_player] = tally
+            ends, sums = self._spans.setdefault(source_player, ([], []))
+            ends.append(self.contributed)
+            sums.append(tally)
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def clear(self):
+        super().clear()
+        self.total = 0
+        self.contributed = 0
+        self.tallies.clear()
+        self._spans.clear()
+
+    def allocate(self, drawn: int):
+        """实际摸了 drawn 张时各来源玩家应分摊的张数，按牌串顺序依次扣减，返回 [(来源玩家, 张数)]"""
+        if drawn >= self.contributed:
+            return list(self.tallies.items())
+        allocation = []
+        for source_player, (ends, sums) in self._spans.items():
+            # 结束位置不超过 drawn 的各项全额计入，跨过 drawn 的那一项按比例截断
+            i = bisect_right(ends, drawn)
+            count = sums[i - 1] if i else 0
+            if i < len(ends):
+                amount = sums[i] - count
+                count += max(0, drawn - (ends[i] - amount))
+            if count:
+                allocation.append((source_player, count))
+        return allocation
+
+def _in_deck(card: UnoCard) -> bool:
+    """是否为牌组中的实体牌（临时牌没有id，武圣虚拟牌的id不小于 DECK_SIZE）"""
+    return card.id is not None and card.id < DECK_SIZE
+
 class PlayedCards:
-    def __init__(self):
-        # d: list of tuples (effective_card, original_card, source_player)
-        self.d: list[tuple[UnoCard, UnoCard, 'Player']] = []
+    """弃牌堆。
+
+    只在环形缓冲 d 中保留最近 capacity 次出牌（显示、跳牌判定和二张技能只需要最近几张），
+    更早的牌以原始牌id的形式压入 buried，供摸牌堆耗尽时重洗。
+    provenance 以牌id索引每张牌最近一次被打出的来源记录，重洗回摸牌堆时移除；
+    武圣等虚拟牌不在牌组中，不建索引，与临时牌一样在最近出牌中查找。
+    """
+    def __init__(self, capacity: int = 16):
+        # d: deque of tuples (effective_card, original_card, source_player)
+        self.d: deque[tuple[UnoCard, UnoCard, 'Player']] = deque(maxlen=capacity)
+        # buried: 已离开环形缓冲的弃牌（原始牌id）
+        self.buried = array('B')
+        # provenance: 牌id -> CardProvenance（生效牌和原始牌的id都指向同一条记录）
+        self.provenance: dict[int, CardProvenance] = {}
 
-    def add_card(self, effective_card: UnoCard, source_player: 'Player', original_card: UnoCard = None):
+    def _bury(self, entry):
+        original_card = entry[1]
+        if original_card.id is not None:
+            self.buried.append(original_card.id)
+
+    def add_card(self, effective_card: UnoCard, source_player: 'Player', original_card: UnoCard = None, turn: int = 0):
         """
         向弃牌堆添加一张牌。
         :param effective_card: 生效的牌（可能是虚拟的，如武圣牌）
         :param source_player: 出牌的玩家
         :param original_card: 实际打出的原始牌，如果与生效牌不同
+        :param turn: 出牌时的回合数
         """
         if original_card is None:
             original_card = effective_card
+        if len(self.d) == self.d.maxlen:
+            self._bury(self.d[0])
         self.d.append((effective_card, original_card, source_player))
+        record = CardProvenance(source_player, turn, effective_card, original_card)
+        if _in_deck(effective_card):
+            self.provenance[effective_card.id] = record
+        if _in_deck(original_card):
+            self.provenance[original_card.id] = record
+
+    def discard(self, card: UnoCard):
+        """直接置入弃牌堆底部（不作为出牌，如开局翻出的黑色牌）"""
+        if card.id is not None:
+            self.buried.append(card.id)
+
+    def take_discards(self) -> array:
+        """取出除顶牌以外的全部弃牌（原始牌id），用于重洗回摸牌堆"""
+        while len(self.d) > 1:
+            self._bury(self.d.popleft())
+        ids, self.buried = self.buried, array('B')
+        for card_id in ids:
+            self.provenance.pop(card_id, None)
+        return ids
 
     def get_one(self) -> Optional[UnoCard]:
         """获取最上面一张生效的牌"""
@@ -31,13 +319,23 @@ class PlayedCards:
 
     def get_last_cards(self, n: int) -> list[UnoCard]:
         """获取最上面n张生效的牌，用于显示"""
-        return [item[0] for item in self.d[-n:]]
+        return [item[0] for item in islice(self.d, max(len(self.d) - n, 0), None)]
+
+    def get_provenance(self, card: UnoCard) -> Optional[CardProvenance]:
+        """按牌id查找该牌最近一次被打出的来源记录（card 可以是生效牌或原始牌）"""
+        if not _in_deck(card):
+            # 牌组之外的临时牌和虚拟牌不在索引中，只能在最近出牌中查找
+            for eff_card, orig_card, source in reversed(self.d):
+                if eff_card is card or orig_card is card:
+                    return CardProvenance(source, 0, eff_card, orig_card)
+            return None
+        return self.provenance.get(card.id)
 
     def get_card_source(self, card: UnoCard) -> Optional['Player']:
         """查找特定生效牌的来源玩家"""
-        for eff_card, _, source in reversed(self.d):
-            if eff_card is card:
-                return source
+        record = self.get_provenance(card)
+        if record is not None and record.effective_card is card:
+            return record.source
         return None
     
     def get_last_play_info(self) -> Optional[tuple[UnoCard, UnoCard, 'Player']]: